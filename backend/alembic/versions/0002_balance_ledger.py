@@ -0,0 +1,54 @@
+"""balance ledger
+
+Revision ID: 0002_balance_ledger
+Revises: 0001_init
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_balance_ledger"
+down_revision = "0001_init"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        "balance_ledger",
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("counterparty_id", sa.BigInteger(), nullable=False),
+        sa.Column("shamsi_year", sa.Integer(), nullable=False),
+        sa.Column("shamsi_month", sa.Integer(), nullable=False),
+        sa.Column("amount", sa.Numeric(16, 2), nullable=False, server_default=sa.text("0")),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="RESTRICT"),
+        sa.ForeignKeyConstraint(["counterparty_id"], ["users.id"], ondelete="RESTRICT"),
+        sa.PrimaryKeyConstraint("user_id", "counterparty_id", "shamsi_year", "shamsi_month"),
+        sa.Index("ix_balance_ledger_period", "shamsi_year", "shamsi_month"),
+    )
+
+    op.execute(
+        """
+        INSERT INTO balance_ledger (user_id, counterparty_id, shamsi_year, shamsi_month, amount)
+        SELECT user_id, counterparty_id, shamsi_year, shamsi_month, SUM(amount)
+        FROM (
+            SELECT e.payer_id AS user_id, p.user_id AS counterparty_id, e.shamsi_year, e.shamsi_month, p.share_amount AS amount
+            FROM expenses e JOIN expense_participants p ON p.expense_id = e.id
+            WHERE e.status = 'approved' AND p.user_id <> e.payer_id
+            UNION ALL
+            SELECT p.user_id, e.payer_id, e.shamsi_year, e.shamsi_month, -p.share_amount
+            FROM expenses e JOIN expense_participants p ON p.expense_id = e.id
+            WHERE e.status = 'approved' AND p.user_id <> e.payer_id
+            UNION ALL
+            SELECT from_user_id, to_user_id, shamsi_year, shamsi_month, amount FROM payments
+            UNION ALL
+            SELECT to_user_id, from_user_id, shamsi_year, shamsi_month, -amount FROM payments
+        ) movements
+        GROUP BY user_id, counterparty_id, shamsi_year, shamsi_month
+        """
+    )
+
+def downgrade() -> None:
+    op.drop_table("balance_ledger")
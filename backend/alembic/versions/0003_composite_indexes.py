@@ -0,0 +1,27 @@
+"""composite indexes for visibility and period filters
+
+Revision ID: 0003_composite_indexes
+Revises: 0002_balance_ledger
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0003_composite_indexes"
+down_revision = "0002_balance_ledger"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_index("ix_expense_participants_user_expense", "expense_participants", ["user_id", "expense_id"])
+    op.drop_index("ix_expense_participants_user_id", table_name="expense_participants")
+    op.create_index("ix_expenses_period", "expenses", ["shamsi_year", "shamsi_month", "id"])
+    op.create_index("ix_payments_period", "payments", ["shamsi_year", "shamsi_month", "id"])
+
+def downgrade() -> None:
+    op.drop_index("ix_payments_period", table_name="payments")
+    op.drop_index("ix_expenses_period", table_name="expenses")
+    op.create_index("ix_expense_participants_user_id", "expense_participants", ["user_id"])
+    op.drop_index("ix_expense_participants_user_expense", table_name="expense_participants")
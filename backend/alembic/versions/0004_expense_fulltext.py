@@ -0,0 +1,24 @@
+"""fulltext index on expense description
+
+Revision ID: 0004_expense_fulltext
+Revises: 0003_composite_indexes
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0004_expense_fulltext"
+down_revision = "0003_composite_indexes"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "mysql":
+        op.execute("CREATE FULLTEXT INDEX ft_expenses_description ON expenses (description) WITH PARSER ngram")
+    else:
+        op.create_index("ft_expenses_description", "expenses", ["description"])
+
+def downgrade() -> None:
+    op.drop_index("ft_expenses_description", table_name="expenses")
@@ -0,0 +1,64 @@
+"""monthly user summary
+
+Revision ID: 0005_monthly_user_summary
+Revises: 0004_expense_fulltext
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_monthly_user_summary"
+down_revision = "0004_expense_fulltext"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        "monthly_user_summary",
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("shamsi_year", sa.Integer(), nullable=False),
+        sa.Column("shamsi_month", sa.Integer(), nullable=False),
+        sa.Column("spent", sa.Numeric(16, 2), nullable=False, server_default=sa.text("0")),
+        sa.Column("paid", sa.Numeric(16, 2), nullable=False, server_default=sa.text("0")),
+        sa.Column("payments_sent", sa.Numeric(16, 2), nullable=False, server_default=sa.text("0")),
+        sa.Column("payments_received", sa.Numeric(16, 2), nullable=False, server_default=sa.text("0")),
+        sa.Column("owed", sa.Numeric(16, 2), nullable=False, server_default=sa.text("0")),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="RESTRICT"),
+        sa.PrimaryKeyConstraint("user_id", "shamsi_year", "shamsi_month"),
+    )
+
+    op.execute(
+        """
+        INSERT INTO monthly_user_summary
+            (user_id, shamsi_year, shamsi_month, spent, paid, payments_sent, payments_received, owed)
+        SELECT user_id, shamsi_year, shamsi_month, SUM(spent), SUM(paid), SUM(sent), SUM(received), SUM(owed)
+        FROM (
+            SELECT payer_id AS user_id, shamsi_year, shamsi_month,
+                   0 AS spent, amount AS paid, 0 AS sent, 0 AS received, 0 AS owed
+            FROM expenses WHERE status = 'approved'
+            UNION ALL
+            SELECT p.user_id, e.shamsi_year, e.shamsi_month, p.share_amount, 0, 0, 0, 0
+            FROM expenses e JOIN expense_participants p ON p.expense_id = e.id
+            WHERE e.status = 'approved'
+            UNION ALL
+            SELECT e.payer_id, e.shamsi_year, e.shamsi_month, 0, 0, 0, 0, p.share_amount
+            FROM expenses e JOIN expense_participants p ON p.expense_id = e.id
+            WHERE e.status = 'approved' AND p.user_id <> e.payer_id
+            UNION ALL
+            SELECT p.user_id, e.shamsi_year, e.shamsi_month, 0, 0, 0, 0, -p.share_amount
+            FROM expenses e JOIN expense_participants p ON p.expense_id = e.id
+            WHERE e.status = 'approved' AND p.user_id <> e.payer_id
+            UNION ALL
+            SELECT from_user_id, shamsi_year, shamsi_month, 0, 0, amount, 0, amount FROM payments
+            UNION ALL
+            SELECT to_user_id, shamsi_year, shamsi_month, 0, 0, 0, amount, -amount FROM payments
+        ) movements
+        GROUP BY user_id, shamsi_year, shamsi_month
+        """
+    )
+
+def downgrade() -> None:
+    op.drop_table("monthly_user_summary")
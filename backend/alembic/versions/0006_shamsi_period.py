@@ -0,0 +1,66 @@
+"""sortable shamsi_period column and range indexes
+
+Revision ID: 0006_shamsi_period
+Revises: 0005_monthly_user_summary
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_shamsi_period"
+down_revision = "0005_monthly_user_summary"
+branch_labels = None
+depends_on = None
+
+PERIOD_EXPR = "shamsi_year * 100 + shamsi_month"
+
+# table -> (old period index, new indexes)
+INDEXES = {
+    "expenses": ("ix_expenses_period", {"ix_expenses_shamsi_period": ["shamsi_period", "id"]}),
+    "payments": ("ix_payments_period", {"ix_payments_shamsi_period": ["shamsi_period", "id"]}),
+    "balance_ledger": (
+        "ix_balance_ledger_period",
+        {
+            "ix_balance_ledger_shamsi_period": ["shamsi_period", "user_id"],
+            "ix_balance_ledger_user_period": ["user_id", "shamsi_period", "counterparty_id"],
+        },
+    ),
+    "monthly_user_summary": (None, {"ix_monthly_user_summary_shamsi_period": ["shamsi_period", "user_id"]}),
+}
+
+OLD_COLUMNS = {
+    "ix_expenses_period": ["shamsi_year", "shamsi_month", "id"],
+    "ix_payments_period": ["shamsi_year", "shamsi_month", "id"],
+    "ix_balance_ledger_period": ["shamsi_year", "shamsi_month"],
+}
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "mysql":
+        # One ALTER per table so each is rebuilt once; the STORED column is
+        # computed for every existing row as part of the rebuild.
+        for table, (old, new) in INDEXES.items():
+            clauses = [f"ADD COLUMN shamsi_period INT AS ({PERIOD_EXPR}) STORED NOT NULL"]
+            clauses += [f"ADD INDEX {name} ({', '.join(cols)})" for name, cols in new.items()]
+            if old:
+                clauses.append(f"DROP INDEX {old}")
+            op.execute(f"ALTER TABLE {table} {', '.join(clauses)}")
+        return
+
+    # SQLite can only add VIRTUAL generated columns to an existing table.
+    for table, (old, new) in INDEXES.items():
+        op.add_column(table, sa.Column("shamsi_period", sa.Integer(), sa.Computed(PERIOD_EXPR, persisted=False)))
+        for name, cols in new.items():
+            op.create_index(name, table, cols)
+        if old:
+            op.drop_index(old, table_name=table)
+
+def downgrade() -> None:
+    for table, (old, new) in INDEXES.items():
+        if old:
+            op.create_index(old, table, OLD_COLUMNS[old])
+        for name in new:
+            op.drop_index(name, table_name=table)
+        op.drop_column(table, "shamsi_period")
@@ -0,0 +1,88 @@
+"""partition participants and payments by shamsi_period, archived periods
+
+Revision ID: 0007_partition_by_period
+Revises: 0006_shamsi_period
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import jdatetime
+import sqlalchemy as sa
+
+revision = "0007_partition_by_period"
+down_revision = "0006_shamsi_period"
+branch_labels = None
+depends_on = None
+
+# table -> primary key before partitioning. MySQL requires the partitioning
+# column in every unique key and does not allow foreign keys on partitioned
+# tables. `expenses` stays unpartitioned because partitioned tables cannot
+# carry its FULLTEXT index; it is kept small by scripts.archive_periods.
+PARTITIONED = {
+    "expense_participants": ["expense_id", "user_id"],
+    "payments": ["id"],
+}
+
+FOREIGN_KEYS = [
+    ("expense_participants", "expenses", "expense_id", "CASCADE"),
+    ("expense_participants", "users", "user_id", "RESTRICT"),
+    ("payments", "users", "from_user_id", "RESTRICT"),
+    ("payments", "users", "to_user_id", "RESTRICT"),
+]
+
+def _partitions(first_year: int, last_year: int) -> str:
+    parts = [f"PARTITION p{y} VALUES LESS THAN ({(y + 1) * 100})" for y in range(first_year, last_year + 1)]
+    parts.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+    return ", ".join(parts)
+
+def upgrade() -> None:
+    op.create_table(
+        "archived_periods",
+        sa.Column("shamsi_period", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("expenses", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("payments", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("archived_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("CURRENT_TIMESTAMP")),
+    )
+
+    bind = op.get_bind()
+    op.add_column("expense_participants", sa.Column("shamsi_period", sa.Integer(), nullable=True))
+    if bind.dialect.name != "mysql":
+        op.execute(
+            "UPDATE expense_participants SET shamsi_period = "
+            "(SELECT e.shamsi_period FROM expenses e WHERE e.id = expense_participants.expense_id)"
+        )
+        with op.batch_alter_table("expense_participants") as batch:
+            batch.alter_column("shamsi_period", existing_type=sa.Integer(), nullable=False)
+        return
+
+    op.execute(
+        "UPDATE expense_participants p JOIN expenses e ON e.id = p.expense_id "
+        "SET p.shamsi_period = e.shamsi_period"
+    )
+    inspector = sa.inspect(bind)
+    for table in PARTITIONED:
+        for fk in inspector.get_foreign_keys(table):
+            op.drop_constraint(fk["name"], table, type_="foreignkey")
+
+    current_year = jdatetime.date.today().year
+    first_year = bind.scalar(
+        sa.text("SELECT MIN(shamsi_year) FROM (SELECT shamsi_year FROM expenses UNION ALL SELECT shamsi_year FROM payments) t")
+    ) or current_year
+    partitions = _partitions(min(first_year, current_year), current_year + 1)
+    for table, pk in PARTITIONED.items():
+        not_null = "MODIFY shamsi_period INT NOT NULL, " if table == "expense_participants" else ""
+        op.execute(f"ALTER TABLE {table} {not_null}DROP PRIMARY KEY, ADD PRIMARY KEY ({', '.join(pk)}, shamsi_period)")
+        op.execute(f"ALTER TABLE {table} PARTITION BY RANGE (shamsi_period) ({partitions})")
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "mysql":
+        for table, pk in PARTITIONED.items():
+            op.execute(f"ALTER TABLE {table} REMOVE PARTITIONING")
+            op.execute(f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY ({', '.join(pk)})")
+        for table, referred, column, ondelete in FOREIGN_KEYS:
+            op.create_foreign_key(None, table, referred, [column], ["id"], ondelete=ondelete)
+    with op.batch_alter_table("expense_participants") as batch:
+        batch.drop_column("shamsi_period")
+    op.drop_table("archived_periods")
@@ -0,0 +1,21 @@
+"""index on expense amount for numeric search
+
+Revision ID: 0008_expense_amount_index
+Revises: 0007_partition_by_period
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0008_expense_amount_index"
+down_revision = "0007_partition_by_period"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_index("ix_expenses_amount", "expenses", ["amount"])
+
+def downgrade() -> None:
+    op.drop_index("ix_expenses_amount", table_name="expenses")
@@ -0,0 +1,22 @@
+"""persisted refresh token version on users
+
+Revision ID: 0009_user_token_version
+Revises: 0008_expense_amount_index
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009_user_token_version"
+down_revision = "0008_expense_amount_index"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column("users", sa.Column("token_version", sa.Integer(), nullable=False, server_default=sa.text("0")))
+
+def downgrade() -> None:
+    op.drop_column("users", "token_version")
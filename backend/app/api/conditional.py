@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Hashable
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+# (version, etag, body, headers)
+_Entry = tuple[int, str, bytes, dict[str, str]]
+
+_responses = TTLCache(maxsize=settings.RESPONSE_CACHE_MAX_SIZE, ttl=settings.RESPONSE_CACHE_TTL_SECONDS)
+_version = 0
+_version_lock = threading.Lock()
+
+# Bumped after every committed write that can change a settlement or a list page.
+# The app has a single group, so one counter covers everything.
+def bump_data_version() -> None:
+    global _version
+    with _version_lock:
+        _version += 1
+
+@lru_cache(maxsize=None)
+def _adapter(response_model: Any) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+def _key(request: Request, scope: Hashable) -> tuple:
+    return (request.url.path, scope, tuple(sorted(request.query_params.multi_items())))
+
+def _lookup(key: tuple) -> tuple[int, _Entry | None]:
+    version = _version
+    entry = _responses.get(key)
+    if entry is not None and entry[0] != version:
+        entry = None
+    return version, entry
+
+def _store(key: tuple, version: int, response_model: Any, content: Any, response: Response, store: bool) -> _Entry:
+    adapter = _adapter(response_model)
+    body = adapter.dump_json(adapter.validate_python(content, from_attributes=True), by_alias=True)
+    headers = dict(response.headers)
+    digest = hashlib.sha256(body)
+    for name, value in sorted(headers.items()):
+        digest.update(f"\n{name}:{value}".encode())
+    entry = (version, f'"{digest.hexdigest()[:32]}"', body, headers)
+    if store:
+        _responses.set(key, entry)
+    return entry
+
+def _not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+def _respond(request: Request, entry: _Entry) -> Response:
+    _, etag, body, headers = entry
+    headers = {**headers, "ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+# `scope` must capture everything about the caller that changes the response
+# (user id, admin view); query parameters are added to the key automatically.
+# Pass store=False when `build` reads from a replica: it may lag behind the
+# current data version by any amount, so its response only gets an ETag.
+def cached_response(
+    request: Request,
+    response: Response,
+    scope: Hashable,
+    response_model: Any,
+    build: Callable[[], Any],
+    store: bool = True,
+) -> Response:
+    key = _key(request, scope)
+    version, entry = _lookup(key)
+    if entry is None:
+        entry = _store(key, version, response_model, build(), response, store)
+    return _respond(request, entry)
+
+async def cached_response_async(
+    request: Request,
+    response: Response,
+    scope: Hashable,
+    response_model: Any,
+    build: Callable[[], Awaitable[Any]],
+    store: bool = True,
+) -> Response:
+    key = _key(request, scope)
+    version, entry = _lookup(key)
+    if entry is None:
+        entry = _store(key, version, response_model, await build(), response, store)
+    return _respond(request, entry)
@@ -2,15 +2,28 @@ from __future__ import annotations
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
-from sqlalchemy.orm import Session
+from jose import JWTError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
 
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.core.database import SessionLocal
+from app.core.database import AsyncSessionLocal, SessionLocal, read_replica
+from app.core.security import decode_token, revoke_claims
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
+_user_cache = TTLCache(maxsize=settings.AUTH_CACHE_MAX_SIZE, ttl=settings.AUTH_CACHE_TTL_SECONDS)
+_CACHED_USER_FIELDS = [c.key for c in User.__table__.columns if c.key != "hashed_password"]
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
 def get_db():
     db = SessionLocal()
     try:
@@ -18,26 +31,73 @@ def get_db():
     finally:
         db.close()
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def _decode_access_token(token: str) -> tuple[int, dict]:
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        sub = payload.get("sub")
-        if not sub:
-            raise credentials_exception
-        user_id = int(sub)
+        return decode_token(token, "access")
     except (JWTError, ValueError):
-        raise credentials_exception
+        raise _credentials_exception()
 
-    user = db.get(User, user_id)
+def _user_from_claims(user_id: int, payload: dict) -> User | None:
+    if "adm" not in payload:
+        return None
+    return User(id=user_id, is_admin=bool(payload["adm"]), is_approved=bool(payload["apr"]), is_active=True)
+
+def revoke_user(user_id: int) -> None:
+    revoke_claims(user_id)
+    _user_cache.delete(user_id)
+
+def _cached_user(user_id: int) -> User | None:
+    fields = _user_cache.get(user_id)
+    if fields is None:
+        return None
+    user = User(**fields)
+    make_transient_to_detached(user)
+    return user
+
+def _remember_user(user: User) -> None:
+    _user_cache.set(user.id, {key: getattr(user, key) for key in _CACHED_USER_FIELDS})
+
+def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> User:
+    user_id, payload = _decode_access_token(token)
+    db.info["user_id"] = user_id
+    user = _user_from_claims(user_id, payload) or _cached_user(user_id)
+    if user is None:
+        user = db.get(User, user_id)
+        if user is not None:
+            _remember_user(user)
     if not user or not user.is_active:
-        raise credentials_exception
+        raise _credentials_exception()
     return user
 
+async def get_current_user_async(db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)) -> User:
+    user_id, payload = _decode_access_token(token)
+    db.info["user_id"] = user_id
+    user = _user_from_claims(user_id, payload) or _cached_user(user_id)
+    if user is None:
+        user = await db.get(User, user_id)
+        if user is not None:
+            _remember_user(user)
+    if not user or not user.is_active:
+        raise _credentials_exception()
+    return user
+
+# For read-only endpoints: the request's session, with its reads sent to a
+# replica unless the caller wrote within READ_YOUR_WRITES_SECONDS.
+def get_read_db(db: Session = Depends(get_db), current: User = Depends(get_current_user)) -> Session:
+    db.info["replica"] = read_replica(current.id)
+    return db
+
+async def get_read_async_db(
+    db: AsyncSession = Depends(get_async_db),
+    current: User = Depends(get_current_user_async),
+) -> AsyncSession:
+    db.info["replica"] = read_replica(current.id, use_async=True)
+    return db
+
 def require_approved_user(current: User = Depends(get_current_user)) -> User:
     if not current.is_approved:
         raise HTTPException(status_code=403, detail="User is not approved by admin yet.")
@@ -47,3 +107,9 @@ def require_admin(current: User = Depends(get_current_user)) -> User:
     if not current.is_admin:
         raise HTTPException(status_code=403, detail="Admin only.")
     return current
+
+async def require_approved_user_async(current: User = Depends(get_current_user_async)) -> User:
+    return require_approved_user(current)
+
+async def require_admin_async(current: User = Depends(get_current_user_async)) -> User:
+    return require_admin(current)
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Literal
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Row, Select
+from sqlalchemy.engine import Engine
+
+from app.core.database import SessionLocal
+
+ExportFormat = Literal["csv", "ndjson"]
+
+EXPORT_CHUNK_ROWS = 1000
+
+_MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+def _csv_value(value):
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=_json_default, ensure_ascii=False)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+def _encode(records: list[dict], columns: list[str], fmt: ExportFormat) -> str:
+    if fmt == "ndjson":
+        return "".join(json.dumps(r, default=_json_default, ensure_ascii=False) + "\n" for r in records)
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerows([_csv_value(r[c]) for c in columns] for r in records)
+    return buf.getvalue()
+
+def _plain_records(rows: Iterable[Row]) -> Iterator[dict]:
+    return (row._asdict() for row in rows)
+
+# The request-scoped session is closed before a streaming body is sent, so the
+# generator opens its own and keeps a server-side cursor for the whole export.
+def export_response(
+    stmt: Select,
+    columns: list[str],
+    fmt: ExportFormat,
+    filename: str,
+    replica: Engine | None = None,
+    to_records: Callable[[Iterable[Row]], Iterator[dict]] = _plain_records,
+) -> StreamingResponse:
+    def generate() -> Iterator[str]:
+        if fmt == "csv":
+            yield _encode([dict(zip(columns, columns))], columns, fmt)
+        with SessionLocal(info={"replica": replica}) as db:
+            rows = db.execute(stmt.execution_options(yield_per=EXPORT_CHUNK_ROWS))
+            records = to_records(rows)
+            while chunk := list(islice(records, EXPORT_CHUNK_ROWS)):
+                yield _encode(chunk, columns, fmt)
+
+    return StreamingResponse(
+        generate(),
+        media_type=_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
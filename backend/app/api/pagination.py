@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+import base64
+
+from fastapi import HTTPException
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(f"id:{last_id}".encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        prefix, _, value = raw.partition(":")
+        if prefix != "id":
+            raise ValueError(raw)
+        return int(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
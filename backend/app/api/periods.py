@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import re
+
+from fastapi import HTTPException
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.core.jalali import shamsi_period
+
+_PERIOD_RE = re.compile(r"^(\d{4})-(\d{1,2})$")
+
+def parse_period(value: str, name: str) -> tuple[int, int]:
+    match = _PERIOD_RE.match(value.strip())
+    if not match or not 1 <= int(match.group(2)) <= 12:
+        raise HTTPException(status_code=400, detail=f"{name} must be a Shamsi month like 1403-07")
+    return int(match.group(1)), int(match.group(2))
+
+def parse_range(from_: str | None, to: str | None) -> tuple[tuple[int, int] | None, tuple[int, int] | None]:
+    start = parse_period(from_, "from") if from_ else None
+    end = parse_period(to, "to") if to else None
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="from must not be after to")
+    return start, end
+
+# Every combination of year/month/from/to becomes bounds on one indexed column,
+# so it resolves to a single range scan.
+def period_filters(
+    period: InstrumentedAttribute,
+    month: InstrumentedAttribute,
+    shamsi_year: int | None,
+    shamsi_month: int | None,
+    from_: str | None,
+    to: str | None,
+) -> list:
+    filters = []
+    start, end = parse_range(from_, to)
+    if shamsi_year is not None and shamsi_month is not None:
+        filters.append(period == shamsi_period(shamsi_year, shamsi_month))
+    elif shamsi_year is not None:
+        filters.append(period.between(shamsi_period(shamsi_year, 1), shamsi_period(shamsi_year, 12)))
+    elif shamsi_month is not None:
+        filters.append(month == shamsi_month)
+    if start:
+        filters.append(period >= shamsi_period(*start))
+    if end:
+        filters.append(period <= shamsi_period(*end))
+    return filters
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.conditional import cached_response_async
+from app.api.deps import get_async_db, get_read_async_db, require_approved_user_async
+from app.api.v1.endpoints import expenses
+from app.models.user import User
+from app.schemas.expense import ExpenseCreate, ExpenseOut, ExpenseApproveResponse
+
+router = APIRouter()
+
+def _out(rows) -> list[ExpenseOut]:
+    return [ExpenseOut.model_validate(e) for e in rows]
+
+@router.post("", response_model=ExpenseOut)
+async def create_expense(payload: ExpenseCreate, db: AsyncSession = Depends(get_async_db), current: User = Depends(require_approved_user_async)) -> ExpenseOut:
+    return await db.run_sync(lambda s: ExpenseOut.model_validate(expenses.create_expense(payload, s, current)))
+
+@router.get("", response_model=list[ExpenseOut])
+async def list_expenses(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_async_db),
+    current: User = Depends(require_approved_user_async),
+    shamsi_year: int | None = None,
+    shamsi_month: int | None = None,
+    from_: str | None = Query(None, alias="from"),
+    to: str | None = None,
+    scope: str | None = None,
+    q: str | None = None,
+    page: int | None = None,
+    per_page: int = 10,
+    cursor: str | None = None,
+    limit: int | None = None,
+    with_count: bool = False,
+) -> Response:
+    return await cached_response_async(
+        request,
+        response,
+        "all" if scope == "all" and current.is_admin else current.id,
+        list[ExpenseOut],
+        lambda: db.run_sync(
+            lambda s: _out(
+                expenses.query_expenses(
+                    response, s, current, shamsi_year, shamsi_month, from_, to,
+                    scope, q, page, per_page, cursor, limit, with_count
+                )
+            )
+        ),
+        store=db.info.get("replica") is None,
+    )
+
+@router.get("/search", response_model=list[ExpenseOut])
+async def search_expenses(
+    q: str = Query(min_length=1, max_length=200),
+    db: AsyncSession = Depends(get_read_async_db),
+    current: User = Depends(require_approved_user_async),
+    scope: str | None = None,
+    limit: int = Query(default=20, ge=1, le=100),
+) -> list[ExpenseOut]:
+    return await db.run_sync(lambda s: _out(expenses.search_expenses(q, s, current, scope, limit)))
+
+@router.get("/pending-my-approvals", response_model=list[ExpenseOut])
+async def pending_my_approvals(db: AsyncSession = Depends(get_read_async_db), current: User = Depends(require_approved_user_async)) -> list[ExpenseOut]:
+    return await db.run_sync(lambda s: _out(expenses.pending_my_approvals(s, current)))
+
+@router.post("/{expense_id}/approve", response_model=ExpenseApproveResponse)
+async def approve_expense(expense_id: int, db: AsyncSession = Depends(get_async_db), current: User = Depends(require_approved_user_async)) -> ExpenseApproveResponse:
+    return await db.run_sync(lambda s: expenses.approve_expense(expense_id, s, current))
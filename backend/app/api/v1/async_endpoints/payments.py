@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.conditional import cached_response_async
+from app.api.deps import get_async_db, get_read_async_db, require_approved_user_async
+from app.api.v1.endpoints import payments
+from app.models.user import User
+from app.schemas.payment import PaymentCreate, PaymentOut
+
+router = APIRouter()
+
+@router.post("", response_model=PaymentOut)
+async def create_payment(payload: PaymentCreate, db: AsyncSession = Depends(get_async_db), current: User = Depends(require_approved_user_async)) -> PaymentOut:
+    return await db.run_sync(lambda s: PaymentOut.model_validate(payments.create_payment(payload, s, current)))
+
+@router.get("", response_model=list[PaymentOut])
+async def list_payments(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_async_db),
+    current: User = Depends(require_approved_user_async),
+    shamsi_year: int | None = None,
+    shamsi_month: int | None = None,
+    from_: str | None = Query(None, alias="from"),
+    to: str | None = None,
+    scope: str | None = None,
+    page: int | None = None,
+    per_page: int = 10,
+    cursor: str | None = None,
+    limit: int | None = None,
+    with_count: bool = False,
+) -> Response:
+    return await cached_response_async(
+        request,
+        response,
+        "all" if scope == "all" and current.is_admin else current.id,
+        list[PaymentOut],
+        lambda: db.run_sync(
+            lambda s: [
+                PaymentOut.model_validate(p)
+                for p in payments.query_payments(
+                    response, s, current, shamsi_year, shamsi_month, from_, to,
+                    scope, page, per_page, cursor, limit, with_count
+                )
+            ]
+        ),
+        store=db.info.get("replica") is None,
+    )
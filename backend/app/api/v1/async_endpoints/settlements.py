@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.conditional import cached_response_async
+from app.api.deps import get_read_async_db, require_approved_user_async
+from app.api.v1.endpoints import settlements
+from app.models.user import User
+from app.schemas.settlement import SettlementReport
+
+router = APIRouter()
+
+@router.get("", response_model=SettlementReport)
+async def settlement_for_month(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_async_db),
+    current: User = Depends(require_approved_user_async),
+    shamsi_year: int | None = None,
+    shamsi_month: int | None = None,
+    from_: str | None = Query(None, alias="from"),
+    to: str | None = None,
+    scope: str | None = None,
+) -> Response:
+    return await cached_response_async(
+        request,
+        response,
+        current.id,
+        SettlementReport,
+        lambda: db.run_sync(
+            lambda s: settlements.settlement_report(shamsi_year, shamsi_month, s, current, scope, from_, to)
+        ),
+        store=db.info.get("replica") is None,
+    )
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_async_db, get_current_user_async
+from app.api.v1.endpoints import users
+from app.models.user import User
+from app.schemas.user import UserOut
+
+router = APIRouter()
+
+@router.get("/me", response_model=UserOut)
+async def me(db: AsyncSession = Depends(get_async_db), current: User = Depends(get_current_user_async)) -> UserOut:
+    return await db.run_sync(lambda s: UserOut.model_validate(users.me(s, current)))
+
+@router.get("", response_model=list[UserOut])
+async def list_users(db: AsyncSession = Depends(get_async_db), current: User = Depends(get_current_user_async)) -> list[UserOut]:
+    return await db.run_sync(lambda s: [UserOut.model_validate(u) for u in users.list_users(s, current)])
@@ -1,20 +1,49 @@
 from fastapi import APIRouter, Depends, HTTPException
+from jose import JWTError
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
 from app.api.deps import get_db
-from app.core.security import verify_password, create_access_token
+from app.core.security import (
+    create_access_token,
+    create_refresh_token,
+    decode_token,
+    verify_and_update_pooled,
+)
 from app.models.user import User
-from app.schemas.auth import Token, LoginRequest
+from app.schemas.auth import Token, LoginRequest, RefreshRequest
 
 router = APIRouter()
 
+def _issue_tokens(user: User) -> Token:
+    claims = {"adm": user.is_admin, "apr": user.is_approved}
+    return Token(
+        access_token=create_access_token(subject=str(user.id), claims=claims),
+        refresh_token=create_refresh_token(subject=str(user.id), version=user.token_version),
+    )
+
 @router.post("/login", response_model=Token)
 def login(payload: LoginRequest, db: Session = Depends(get_db)) -> Token:
     user = db.scalar(select(User).where(User.username == payload.username))
-    if not user or not verify_password(payload.password, user.hashed_password):
+    if not user:
+        raise HTTPException(status_code=400, detail="Incorrect username or password")
+    valid, new_hash = verify_and_update_pooled(payload.password, user.hashed_password)
+    if not valid:
         raise HTTPException(status_code=400, detail="Incorrect username or password")
     if not user.is_active:
         raise HTTPException(status_code=403, detail="User is inactive")
-    token = create_access_token(subject=str(user.id))
-    return Token(access_token=token)
+    if new_hash:
+        user.hashed_password = new_hash
+        db.commit()
+    return _issue_tokens(user)
+
+@router.post("/refresh", response_model=Token)
+def refresh(payload: RefreshRequest, db: Session = Depends(get_db)) -> Token:
+    try:
+        user_id, claims = decode_token(payload.refresh_token, "refresh")
+    except (JWTError, ValueError):
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    user = db.get(User, user_id)
+    if not user or not user.is_active or claims.get("ver", 0) != user.token_version:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    return _issue_tokens(user)
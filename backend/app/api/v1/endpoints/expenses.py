@@ -1,130 +1,268 @@
 from __future__ import annotations
 
+import re
 from datetime import datetime, timezone
-from decimal import Decimal, ROUND_HALF_UP
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from itertools import groupby
+from typing import Iterator
 
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from math import ceil
-from sqlalchemy.orm import Session
-from sqlalchemy import select, and_, or_, cast, String, func
+from sqlalchemy.orm import Session, aliased, selectinload
+from sqlalchemy import select, and_, or_, exists, func, literal, union_all
+from sqlalchemy.dialects.mysql import match
 
-from app.api.deps import get_db, require_approved_user, require_admin
-from app.core.jalali import to_shamsi_year_month
+from app.api.conditional import bump_data_version, cached_response
+from app.api.deps import get_db, get_read_db, require_approved_user, require_admin
+from app.api.export import ExportFormat, export_response
+from app.api.pagination import decode_cursor, encode_cursor
+from app.api.periods import period_filters
+from app.core.database import read_replica
+from app.core.jalali import shamsi_period, to_shamsi_year_month
 from app.models.user import User
 from app.models.expense import Expense, ExpenseParticipant
-from app.schemas.expense import ExpenseCreate, ExpenseOut, ExpenseApproveResponse
+from app.schemas.expense import (
+    ExpenseApproveResponse,
+    ExpenseBatchResult,
+    ExpenseBulkApproveRequest,
+    ExpenseBulkApproveResult,
+    ExpenseCreate,
+    ExpenseOut,
+    MAX_BATCH_SIZE,
+)
+from app.services import ledger, split, summary
 
 router = APIRouter()
 
 def _round2(x: Decimal) -> Decimal:
     return x.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
 
-@router.post("", response_model=ExpenseOut)
-def create_expense(payload: ExpenseCreate, db: Session = Depends(get_db), current: User = Depends(require_approved_user)) -> Expense:
-    participant_ids = list(dict.fromkeys(payload.participant_user_ids))
-    if not participant_ids:
-        raise HTTPException(status_code=400, detail="participant_user_ids cannot be empty")
+_AMOUNT_RANGE = re.compile(r"^(\d+(?:\.\d+)?)(?:-|\.\.)(\d+(?:\.\d+)?)$")
+
+def _parse_amount_query(q: str) -> tuple[Decimal, Decimal] | None:
+    text = re.sub(r"[\s,\u066c]", "", q)
+    m = _AMOUNT_RANGE.match(text)
+    if m:
+        low, high = sorted((Decimal(m.group(1)), Decimal(m.group(2))))
+        return low, high
+    try:
+        value = Decimal(text)
+    except InvalidOperation:
+        return None
+    return (value, value) if value.is_finite() else None
+
+# MySQL's ngram parser (default ngram_token_size) ignores shorter words.
+NGRAM_TOKEN_SIZE = 2
 
-    users = db.scalars(select(User).where(User.id.in_(participant_ids))).all()
-    if len(users) != len(participant_ids):
-        raise HTTPException(status_code=400, detail="Some participant_user_ids do not exist")
+# One row per matching expense: (id, amount_hit, score). Each branch is its own
+# indexed SELECT (FULLTEXT on description, ix_expenses_amount on amount); an OR
+# of the two would disable both indexes. Text shorter than an ngram falls back
+# to a LIKE scan, as the frontend searches from the first keystroke.
+def _search_matches(db: Session, q: str):
+    if len(q) >= NGRAM_TOKEN_SIZE and db.get_bind().dialect.name == "mysql":
+        text_match = match(Expense.description, against=q).in_natural_language_mode()
+        score = text_match
+    else:
+        text_match = Expense.description.ilike(f"%{q}%")
+        score = literal(0.0)
+    branches = [select(Expense.id.label("id"), literal(0).label("amount_hit"), score.label("score")).where(text_match)]
+    amounts = _parse_amount_query(q)
+    if amounts:
+        branches.append(
+            select(Expense.id.label("id"), literal(1).label("amount_hit"), literal(0.0).label("score"))
+            .where(Expense.amount.between(*amounts))
+        )
+    hits = union_all(*branches).subquery("search_hits")
+    return (
+        select(hits.c.id, func.max(hits.c.amount_hit).label("amount_hit"), func.max(hits.c.score).label("score"))
+        .group_by(hits.c.id)
+        .subquery("search_matches")
+    )
+
+def _visible_to(user_id: int):
+    return or_(
+        Expense.payer_id == user_id,
+        exists().where(ExpenseParticipant.expense_id == Expense.id, ExpenseParticipant.user_id == user_id),
+    )
+
+def _list_filters(
+    db: Session,
+    current: User,
+    shamsi_year: int | None,
+    shamsi_month: int | None,
+    from_: str | None,
+    to: str | None,
+    scope: str | None,
+    q: str | None,
+) -> list:
+    filters = period_filters(Expense.shamsi_period, Expense.shamsi_month, shamsi_year, shamsi_month, from_, to)
+    if q and q.strip():
+        filters.append(Expense.id.in_(select(_search_matches(db, q.strip()).c.id)))
+    if not (scope == "all" and current.is_admin):
+        filters.append(_visible_to(current.id))
+    return filters
 
-    not_approved = [u.id for u in users if not u.is_approved]
+def _participant_error(participant_ids: list[int], users: dict[int, User]) -> str | None:
+    if not participant_ids:
+        return "participant_user_ids cannot be empty"
+    if any(uid not in users for uid in participant_ids):
+        return "Some participant_user_ids do not exist"
+    not_approved = [uid for uid in participant_ids if not users[uid].is_approved]
     if not_approved:
-        raise HTTPException(status_code=400, detail=f"These users are not approved: {not_approved}")
-    inactive = [u.id for u in users if not u.is_active]
+        return f"These users are not approved: {not_approved}"
+    inactive = [uid for uid in participant_ids if not users[uid].is_active]
     if inactive:
-        raise HTTPException(status_code=400, detail=f"These users are inactive: {inactive}")
+        return f"These users are inactive: {inactive}"
+    return None
 
-    sh_y, sh_m = to_shamsi_year_month(payload.expense_date)
+def _split_error(payload: ExpenseCreate, participant_ids: list[int]) -> str | None:
+    if payload.split == "weighted":
+        if payload.weights is None:
+            return "weights are required for a weighted split"
+        if set(payload.weights) != set(participant_ids):
+            return "weights must have exactly one entry per participant"
+    elif payload.split == "exact":
+        if payload.share_amounts is None:
+            return "share_amounts are required for an exact split"
+        if set(payload.share_amounts) != set(participant_ids):
+            return "share_amounts must have exactly one entry per participant"
+        total = sum(payload.share_amounts.values(), Decimal("0"))
+        if total != _round2(Decimal(payload.amount)):
+            return f"share_amounts add up to {total}, expected {_round2(Decimal(payload.amount))}"
+    return None
+
+def _shares(payload: ExpenseCreate, participant_ids: list[int]) -> list[Decimal]:
+    if payload.split == "exact":
+        return [_round2(payload.share_amounts[uid]) for uid in participant_ids]
+    if payload.split == "weighted":
+        weights = [payload.weights[uid] for uid in participant_ids]
+    else:
+        weights = [Decimal(1)] * len(participant_ids)
+    return split.split_amount(Decimal(payload.amount), weights)
 
-    count = Decimal(len(participant_ids))
-    share = _round2(Decimal(payload.amount) / count)
+def _build_expense(db: Session, payload: ExpenseCreate, participant_ids: list[int], payer_id: int) -> Expense:
+    sh_y, sh_m = to_shamsi_year_month(payload.expense_date)
 
+    now = datetime.now(timezone.utc)
+    participants = [
+        ExpenseParticipant(
+            user_id=uid,
+            shamsi_period=shamsi_period(sh_y, sh_m),
+            share_amount=share,
+            approved=uid == payer_id,
+            approved_at=(now if uid == payer_id else None),
+        )
+        for uid, share in zip(participant_ids, _shares(payload, participant_ids))
+    ]
     expense = Expense(
-        payer_id=current.id,
+        payer_id=payer_id,
         amount=_round2(Decimal(payload.amount)),
         description=payload.description,
         expense_date=payload.expense_date,
         shamsi_year=sh_y,
         shamsi_month=sh_m,
         status="pending",
+        participants=participants,
     )
     db.add(expense)
-    db.flush()
-
-    participants: list[ExpenseParticipant] = []
-    for uid in participant_ids:
-        auto = uid == current.id
-        participants.append(
-            ExpenseParticipant(
-                expense_id=expense.id,
-                user_id=uid,
-                share_amount=share,
-                approved=auto,
-                approved_at=(datetime.now(timezone.utc) if auto else None),
-            )
-        )
-
-    expense.participants = participants
-    db.add_all(participants)
 
     if all(p.approved for p in participants):
         expense.status = "approved"
+        ledger.record_expense(db, expense, participants)
+        summary.record_expense(db, expense, participants)
+    return expense
+
+@router.post("", response_model=ExpenseOut)
+def create_expense(payload: ExpenseCreate, db: Session = Depends(get_db), current: User = Depends(require_approved_user)) -> Expense:
+    participant_ids = list(dict.fromkeys(payload.participant_user_ids))
+    users = {u.id: u for u in db.scalars(select(User).where(User.id.in_(participant_ids)))}
+    error = _participant_error(participant_ids, users) or _split_error(payload, participant_ids)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
 
+    expense = _build_expense(db, payload, participant_ids, current.id)
     db.commit()
+    bump_data_version()
     db.refresh(expense)
     return expense
 
-@router.get("", response_model=list[ExpenseOut])
-def list_expenses(
-    response: Response,
+@router.post("/batch", response_model=list[ExpenseBatchResult])
+def create_expenses_batch(
+    payload: list[ExpenseCreate] = Body(max_length=MAX_BATCH_SIZE),
     db: Session = Depends(get_db),
     current: User = Depends(require_approved_user),
-    shamsi_year: int | None = None,
-    shamsi_month: int | None = None,
-    scope: str | None = None,
-    q: str | None = None,
-    page: int | None = None,
-    per_page: int = 10,
+) -> list[ExpenseBatchResult]:
+    all_ids = {uid for item in payload for uid in item.participant_user_ids}
+    users = {u.id: u for u in db.scalars(select(User).where(User.id.in_(all_ids)))} if all_ids else {}
+
+    results: list[ExpenseBatchResult] = []
+    created: list[tuple[int, Expense]] = []
+    for index, item in enumerate(payload):
+        participant_ids = list(dict.fromkeys(item.participant_user_ids))
+        error = _participant_error(participant_ids, users) or _split_error(item, participant_ids)
+        if error:
+            results.append(ExpenseBatchResult(index=index, ok=False, error=error))
+            continue
+        created.append((index, _build_expense(db, item, participant_ids, current.id)))
+
+    db.flush()
+    results.extend(
+        ExpenseBatchResult(index=index, ok=True, expense_id=expense.id, expense_status=expense.status)
+        for index, expense in created
+    )
+    db.commit()
+    bump_data_version()
+    results.sort(key=lambda r: r.index)
+    return results
+
+def query_expenses(
+    response: Response,
+    db: Session,
+    current: User,
+    shamsi_year: int | None,
+    shamsi_month: int | None,
+    from_: str | None,
+    to: str | None,
+    scope: str | None,
+    q: str | None,
+    page: int | None,
+    per_page: int,
+    cursor: str | None,
+    limit: int | None,
+    with_count: bool,
 ) -> list[Expense]:
     if page is not None and (page <= 0 or per_page <= 0):
         raise HTTPException(status_code=400, detail="page and per_page must be positive")
-    base_filters = []
-    if shamsi_year is not None:
-        base_filters.append(Expense.shamsi_year == shamsi_year)
-    if shamsi_month is not None:
-        base_filters.append(Expense.shamsi_month == shamsi_month)
-    if q:
-        q_trim = q.strip()
-        if q_trim:
-            like = f"%{q_trim}%"
-            base_filters.append(
-                or_(
-                    Expense.description.ilike(like),
-                    cast(Expense.amount, String).like(like),
-                )
-            )
-
-    needs_scope_filter = not (scope == "all" and current.is_admin)
-    stmt = select(Expense).order_by(Expense.id.desc())
-    if needs_scope_filter:
-        stmt = stmt.join(ExpenseParticipant, ExpenseParticipant.expense_id == Expense.id, isouter=True)
-        stmt = stmt.where(or_(Expense.payer_id == current.id, ExpenseParticipant.user_id == current.id))
+    cursor_mode = cursor is not None or limit is not None
+    if cursor_mode and page is not None:
+        raise HTTPException(status_code=400, detail="page cannot be combined with cursor/limit")
+    if limit is not None and limit <= 0:
+        raise HTTPException(status_code=400, detail="limit must be positive")
+    if cursor is not None and limit is None and per_page <= 0:
+        raise HTTPException(status_code=400, detail="per_page must be positive")
+    base_filters = _list_filters(db, current, shamsi_year, shamsi_month, from_, to, scope, q)
+    stmt = select(Expense).options(selectinload(Expense.participants)).order_by(Expense.id.desc())
     if base_filters:
         stmt = stmt.where(*base_filters)
-    if needs_scope_filter:
-        stmt = stmt.distinct()
-    if page is not None:
-        count_stmt = select(func.count(func.distinct(Expense.id))).select_from(Expense)
-        if needs_scope_filter:
-            count_stmt = count_stmt.join(ExpenseParticipant, ExpenseParticipant.expense_id == Expense.id, isouter=True)
-            count_stmt = count_stmt.where(or_(Expense.payer_id == current.id, ExpenseParticipant.user_id == current.id))
+    if page is not None or with_count:
+        count_stmt = select(func.count()).select_from(Expense)
         if base_filters:
             count_stmt = count_stmt.where(*base_filters)
         total = db.scalar(count_stmt) or 0
-        total_pages = ceil(total / per_page) if per_page else 0
         response.headers["X-Total-Count"] = str(total)
+    if cursor_mode:
+        limit = limit or per_page
+        if cursor is not None:
+            stmt = stmt.where(Expense.id < decode_cursor(cursor))
+        expenses = db.scalars(stmt.limit(limit + 1)).all()
+        if len(expenses) > limit:
+            expenses = expenses[:limit]
+            response.headers["X-Next-Cursor"] = encode_cursor(expenses[-1].id)
+        response.headers["X-Per-Page"] = str(limit)
+        return list(expenses)
+    if page is not None:
+        total_pages = ceil(total / per_page) if per_page else 0
         response.headers["X-Total-Pages"] = str(total_pages)
         response.headers["X-Per-Page"] = str(per_page)
         response.headers["X-Page"] = str(page)
@@ -132,25 +270,182 @@ def list_expenses(
     expenses = db.scalars(stmt).all()
     return list(expenses)
 
-@router.get("/pending-my-approvals", response_model=list[ExpenseOut])
-def pending_my_approvals(db: Session = Depends(get_db), current: User = Depends(require_approved_user)) -> list[Expense]:
-    expense_ids = db.scalars(
-        select(ExpenseParticipant.expense_id).where(
-            and_(ExpenseParticipant.user_id == current.id, ExpenseParticipant.approved == False)  # noqa: E712
+@router.get("", response_model=list[ExpenseOut])
+def list_expenses(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current: User = Depends(require_approved_user),
+    shamsi_year: int | None = None,
+    shamsi_month: int | None = None,
+    from_: str | None = Query(None, alias="from"),
+    to: str | None = None,
+    scope: str | None = None,
+    q: str | None = None,
+    page: int | None = None,
+    per_page: int = 10,
+    cursor: str | None = None,
+    limit: int | None = None,
+    with_count: bool = False,
+) -> Response:
+    return cached_response(
+        request,
+        response,
+        "all" if scope == "all" and current.is_admin else current.id,
+        list[ExpenseOut],
+        lambda: query_expenses(
+            response, db, current, shamsi_year, shamsi_month, from_, to,
+            scope, q, page, per_page, cursor, limit, with_count
+        ),
+        store=db.info.get("replica") is None,
+    )
+
+_EXPORT_COLUMNS = [
+    "id", "payer_id", "amount", "description", "expense_date",
+    "shamsi_year", "shamsi_month", "status", "created_at", "participants",
+]
+
+def _expense_records(rows) -> Iterator[dict]:
+    for _, group in groupby(rows, key=lambda r: r.id):
+        group = list(group)
+        record = {c: getattr(group[0], c) for c in _EXPORT_COLUMNS[:-1]}
+        record["participants"] = [
+            {"user_id": r.user_id, "share_amount": r.share_amount, "approved": r.approved} for r in group
+        ]
+        yield record
+
+@router.get("/export")
+def export_expenses(
+    db: Session = Depends(get_db),
+    current: User = Depends(require_approved_user),
+    fmt: ExportFormat = Query("csv", alias="format"),
+    shamsi_year: int | None = None,
+    shamsi_month: int | None = None,
+    from_: str | None = Query(None, alias="from"),
+    to: str | None = None,
+    scope: str | None = None,
+    q: str | None = None,
+) -> StreamingResponse:
+    # Aliased so the visibility EXISTS still correlates with expenses only.
+    participant = aliased(ExpenseParticipant)
+    stmt = (
+        select(
+            *(getattr(Expense, c) for c in _EXPORT_COLUMNS[:-1]),
+            participant.user_id,
+            participant.share_amount,
+            participant.approved,
         )
+        .join(participant, participant.expense_id == Expense.id)
+        .where(*_list_filters(db, current, shamsi_year, shamsi_month, from_, to, scope, q))
+        .order_by(Expense.id.desc(), participant.user_id)
+    )
+    return export_response(stmt, _EXPORT_COLUMNS, fmt, "expenses", read_replica(current.id), _expense_records)
+
+@router.get("/search", response_model=list[ExpenseOut])
+def search_expenses(
+    q: str = Query(min_length=1, max_length=200),
+    db: Session = Depends(get_read_db),
+    current: User = Depends(require_approved_user),
+    scope: str | None = None,
+    limit: int = Query(default=20, ge=1, le=100),
+) -> list[Expense]:
+    matches = _search_matches(db, q.strip())
+    stmt = (
+        select(Expense)
+        .join(matches, matches.c.id == Expense.id)
+        .options(selectinload(Expense.participants))
+    )
+    if not (scope == "all" and current.is_admin):
+        stmt = stmt.where(_visible_to(current.id))
+    stmt = stmt.order_by(matches.c.amount_hit.desc(), matches.c.score.desc(), Expense.id.desc())
+    expenses = db.scalars(stmt.limit(limit)).all()
+    return list(expenses)
+
+@router.get("/pending-my-approvals", response_model=list[ExpenseOut])
+def pending_my_approvals(db: Session = Depends(get_read_db), current: User = Depends(require_approved_user)) -> list[Expense]:
+    expenses = db.scalars(
+        select(Expense)
+        .join(ExpenseParticipant, ExpenseParticipant.expense_id == Expense.id)
+        .where(and_(ExpenseParticipant.user_id == current.id, ExpenseParticipant.approved == False))  # noqa: E712
+        .options(selectinload(Expense.participants))
     ).all()
-    if not expense_ids:
-        return []
-    expenses = db.scalars(select(Expense).where(Expense.id.in_(expense_ids))).all()
     return list(expenses)
 
+@router.post("/approve", response_model=list[ExpenseBulkApproveResult])
+def approve_expenses(
+    payload: ExpenseBulkApproveRequest,
+    db: Session = Depends(get_db),
+    current: User = Depends(require_approved_user),
+) -> list[ExpenseBulkApproveResult]:
+    expense_ids = list(dict.fromkeys(payload.expense_ids))
+    rows = db.execute(
+        select(Expense, ExpenseParticipant)
+        .join(ExpenseParticipant, and_(ExpenseParticipant.expense_id == Expense.id, ExpenseParticipant.user_id == current.id))
+        .where(Expense.id.in_(expense_ids))
+        .with_for_update()
+    ).all()
+    found = {expense.id: (expense, ep) for expense, ep in rows}
+
+    missing = [eid for eid in expense_ids if eid not in found]
+    existing = set(db.scalars(select(Expense.id).where(Expense.id.in_(missing)))) if missing else set()
+
+    now = datetime.now(timezone.utc)
+    changed: list[int] = []
+    for expense, ep in found.values():
+        if not ep.approved:
+            ep.approved = True
+            ep.approved_at = now
+            changed.append(expense.id)
+
+    if changed:
+        db.flush()
+        # Locking read: sees approvals committed by concurrent requests.
+        still_pending = set(
+            db.scalars(
+                select(ExpenseParticipant.expense_id)
+                .where(ExpenseParticipant.expense_id.in_(changed), ExpenseParticipant.approved == False)  # noqa: E712
+                .with_for_update()
+            )
+        )
+        completed = [found[eid][0] for eid in changed if eid not in still_pending]
+        if completed:
+            db.scalars(
+                select(Expense)
+                .where(Expense.id.in_([e.id for e in completed]))
+                .options(selectinload(Expense.participants))
+            ).all()
+            for expense in completed:
+                expense.status = "approved"
+            ledger.record_expenses(db, completed)
+            summary.record_expenses(db, completed)
+
+    results: list[ExpenseBulkApproveResult] = []
+    for eid in expense_ids:
+        if eid in found:
+            results.append(ExpenseBulkApproveResult(expense_id=eid, ok=True, expense_status=found[eid][0].status))
+        elif eid in existing:
+            results.append(ExpenseBulkApproveResult(expense_id=eid, ok=False, error="You are not a participant of this expense"))
+        else:
+            results.append(ExpenseBulkApproveResult(expense_id=eid, ok=False, error="Expense not found"))
+    db.commit()
+    bump_data_version()
+    return results
+
 @router.post("/{expense_id}/approve", response_model=ExpenseApproveResponse)
 def approve_expense(expense_id: int, db: Session = Depends(get_db), current: User = Depends(require_approved_user)) -> ExpenseApproveResponse:
-    expense = db.get(Expense, expense_id)
+    expense = db.get(Expense, expense_id, with_for_update=True)
     if not expense:
         raise HTTPException(status_code=404, detail="Expense not found")
 
-    ep = db.get(ExpenseParticipant, {"expense_id": expense_id, "user_id": current.id})
+    # A plain SELECT would read the transaction's snapshot, which can predate the
+    # expense lock and miss a concurrent approval; a locking read sees it.
+    participants = db.scalars(
+        select(ExpenseParticipant)
+        .where(ExpenseParticipant.expense_id == expense_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    ).all()
+    ep = next((p for p in participants if p.user_id == current.id), None)
     if not ep:
         raise HTTPException(status_code=403, detail="You are not a participant of this expense")
 
@@ -160,13 +455,15 @@ def approve_expense(expense_id: int, db: Session = Depends(get_db), current: Use
     ep.approved = True
     ep.approved_at = datetime.now(timezone.utc)
 
-    participants = db.scalars(select(ExpenseParticipant).where(ExpenseParticipant.expense_id == expense_id)).all()
     if all(p.approved for p in participants):
         expense.status = "approved"
+        ledger.record_expense(db, expense, participants)
+        summary.record_expense(db, expense, participants)
 
+    result = ExpenseApproveResponse(expense_id=expense_id, user_id=current.id, approved=True, expense_status=expense.status)
     db.commit()
-    db.refresh(expense)
-    return ExpenseApproveResponse(expense_id=expense_id, user_id=current.id, approved=True, expense_status=expense.status)
+    bump_data_version()
+    return result
 
 @router.delete("/{expense_id}", status_code=204, response_class=Response)
 def delete_expense(expense_id: int, db: Session = Depends(get_db), _: User = Depends(require_admin)) -> Response:
@@ -176,6 +473,9 @@ def delete_expense(expense_id: int, db: Session = Depends(get_db), _: User = Dep
     if expense.status == "approved":
         raise HTTPException(status_code=400, detail="Approved expense cannot be deleted")
 
+    ledger.revert_expense(db, expense)
+    summary.revert_expense(db, expense)
     db.delete(expense)
     db.commit()
+    bump_data_version()
     return Response(status_code=204)
@@ -2,39 +2,44 @@ from __future__ import annotations
 
 from decimal import Decimal, ROUND_HALF_UP
 
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from math import ceil
 from sqlalchemy.orm import Session
 from sqlalchemy import select, or_, func
 
-from app.api.deps import get_db, require_approved_user
+from app.api.conditional import bump_data_version, cached_response
+from app.api.deps import get_db, get_read_db, require_approved_user
+from app.api.export import ExportFormat, export_response
+from app.api.pagination import decode_cursor, encode_cursor
+from app.api.periods import period_filters
+from app.core.database import read_replica
 from app.core.jalali import to_shamsi_year_month
 from app.models.user import User
 from app.models.payment import Payment
-from app.schemas.payment import PaymentCreate, PaymentOut
+from app.schemas.payment import MAX_BATCH_SIZE, PaymentBatchResult, PaymentCreate, PaymentOut
+from app.services import ledger, summary
 
 router = APIRouter()
 
 def _round2(x: Decimal) -> Decimal:
     return x.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
 
-@router.post("", response_model=PaymentOut)
-def create_payment(payload: PaymentCreate, db: Session = Depends(get_db), current: User = Depends(require_approved_user)) -> Payment:
-    if payload.to_user_id == current.id:
-        raise HTTPException(status_code=400, detail="to_user_id cannot be yourself")
-
-    to_user = db.get(User, payload.to_user_id)
+def _receiver_error(payer_id: int, to_user_id: int, to_user: User | None) -> tuple[int, str] | None:
+    if to_user_id == payer_id:
+        return 400, "to_user_id cannot be yourself"
     if not to_user:
-        raise HTTPException(status_code=404, detail="Receiver user not found")
+        return 404, "Receiver user not found"
     if not to_user.is_approved:
-        raise HTTPException(status_code=400, detail="Receiver user is not approved")
+        return 400, "Receiver user is not approved"
     if not to_user.is_active:
-        raise HTTPException(status_code=400, detail="Receiver user is inactive")
+        return 400, "Receiver user is inactive"
+    return None
 
+def _build_payment(payload: PaymentCreate, payer_id: int) -> Payment:
     sh_y, sh_m = to_shamsi_year_month(payload.payment_date)
-
-    payment = Payment(
-        from_user_id=current.id,
+    return Payment(
+        from_user_id=payer_id,
         to_user_id=payload.to_user_id,
         amount=_round2(Decimal(payload.amount)),
         description=payload.description,
@@ -42,45 +47,164 @@ def create_payment(payload: PaymentCreate, db: Session = Depends(get_db), curren
         shamsi_year=sh_y,
         shamsi_month=sh_m,
     )
+
+def _list_filters(
+    current: User,
+    shamsi_year: int | None,
+    shamsi_month: int | None,
+    from_: str | None,
+    to: str | None,
+    scope: str | None,
+) -> list:
+    filters = period_filters(Payment.shamsi_period, Payment.shamsi_month, shamsi_year, shamsi_month, from_, to)
+    if not (scope == "all" and current.is_admin):
+        filters.append(or_(Payment.from_user_id == current.id, Payment.to_user_id == current.id))
+    return filters
+
+@router.post("", response_model=PaymentOut)
+def create_payment(payload: PaymentCreate, db: Session = Depends(get_db), current: User = Depends(require_approved_user)) -> Payment:
+    to_user = db.get(User, payload.to_user_id) if payload.to_user_id != current.id else None
+    error = _receiver_error(current.id, payload.to_user_id, to_user)
+    if error:
+        raise HTTPException(status_code=error[0], detail=error[1])
+
+    payment = _build_payment(payload, current.id)
     db.add(payment)
+    ledger.record_payment(db, payment)
+    summary.record_payment(db, payment)
     db.commit()
+    bump_data_version()
     db.refresh(payment)
     return payment
 
-@router.get("", response_model=list[PaymentOut])
-def list_payments(
-    response: Response,
+@router.post("/batch", response_model=list[PaymentBatchResult])
+def create_payments_batch(
+    payload: list[PaymentCreate] = Body(max_length=MAX_BATCH_SIZE),
     db: Session = Depends(get_db),
     current: User = Depends(require_approved_user),
-    shamsi_year: int | None = None,
-    shamsi_month: int | None = None,
-    scope: str | None = None,
-    page: int | None = None,
-    per_page: int = 10,
+) -> list[PaymentBatchResult]:
+    to_ids = {item.to_user_id for item in payload}
+    receivers = {u.id: u for u in db.scalars(select(User).where(User.id.in_(to_ids)))} if to_ids else {}
+
+    results: list[PaymentBatchResult] = []
+    created: list[tuple[int, Payment]] = []
+    for index, item in enumerate(payload):
+        error = _receiver_error(current.id, item.to_user_id, receivers.get(item.to_user_id))
+        if error:
+            results.append(PaymentBatchResult(index=index, ok=False, error=error[1]))
+            continue
+        created.append((index, _build_payment(item, current.id)))
+
+    db.add_all(payment for _, payment in created)
+    ledger.record_payments(db, [payment for _, payment in created])
+    summary.record_payments(db, [payment for _, payment in created])
+    db.flush()
+    results.extend(PaymentBatchResult(index=index, ok=True, payment_id=payment.id) for index, payment in created)
+    db.commit()
+    bump_data_version()
+    results.sort(key=lambda r: r.index)
+    return results
+
+def query_payments(
+    response: Response,
+    db: Session,
+    current: User,
+    shamsi_year: int | None,
+    shamsi_month: int | None,
+    from_: str | None,
+    to: str | None,
+    scope: str | None,
+    page: int | None,
+    per_page: int,
+    cursor: str | None,
+    limit: int | None,
+    with_count: bool,
 ) -> list[Payment]:
     if page is not None and (page <= 0 or per_page <= 0):
         raise HTTPException(status_code=400, detail="page and per_page must be positive")
-    filters = []
-    if shamsi_year is not None:
-        filters.append(Payment.shamsi_year == shamsi_year)
-    if shamsi_month is not None:
-        filters.append(Payment.shamsi_month == shamsi_month)
-    if not (scope == "all" and current.is_admin):
-        filters.append(or_(Payment.from_user_id == current.id, Payment.to_user_id == current.id))
-
+    cursor_mode = cursor is not None or limit is not None
+    if cursor_mode and page is not None:
+        raise HTTPException(status_code=400, detail="page cannot be combined with cursor/limit")
+    if limit is not None and limit <= 0:
+        raise HTTPException(status_code=400, detail="limit must be positive")
+    if cursor is not None and limit is None and per_page <= 0:
+        raise HTTPException(status_code=400, detail="per_page must be positive")
+    filters = _list_filters(current, shamsi_year, shamsi_month, from_, to, scope)
     stmt = select(Payment).order_by(Payment.id.desc())
     if filters:
         stmt = stmt.where(*filters)
-    if page is not None:
+    if page is not None or with_count:
         count_stmt = select(func.count()).select_from(Payment)
         if filters:
             count_stmt = count_stmt.where(*filters)
         total = db.scalar(count_stmt) or 0
-        total_pages = ceil(total / per_page) if per_page else 0
         response.headers["X-Total-Count"] = str(total)
+    if cursor_mode:
+        limit = limit or per_page
+        if cursor is not None:
+            stmt = stmt.where(Payment.id < decode_cursor(cursor))
+        payments = db.scalars(stmt.limit(limit + 1)).all()
+        if len(payments) > limit:
+            payments = payments[:limit]
+            response.headers["X-Next-Cursor"] = encode_cursor(payments[-1].id)
+        response.headers["X-Per-Page"] = str(limit)
+        return list(payments)
+    if page is not None:
+        total_pages = ceil(total / per_page) if per_page else 0
         response.headers["X-Total-Pages"] = str(total_pages)
         response.headers["X-Per-Page"] = str(per_page)
         response.headers["X-Page"] = str(page)
         stmt = stmt.limit(per_page).offset((page - 1) * per_page)
     payments = db.scalars(stmt).all()
     return list(payments)
+
+@router.get("", response_model=list[PaymentOut])
+def list_payments(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current: User = Depends(require_approved_user),
+    shamsi_year: int | None = None,
+    shamsi_month: int | None = None,
+    from_: str | None = Query(None, alias="from"),
+    to: str | None = None,
+    scope: str | None = None,
+    page: int | None = None,
+    per_page: int = 10,
+    cursor: str | None = None,
+    limit: int | None = None,
+    with_count: bool = False,
+) -> Response:
+    return cached_response(
+        request,
+        response,
+        "all" if scope == "all" and current.is_admin else current.id,
+        list[PaymentOut],
+        lambda: query_payments(
+            response, db, current, shamsi_year, shamsi_month, from_, to,
+            scope, page, per_page, cursor, limit, with_count
+        ),
+        store=db.info.get("replica") is None,
+    )
+
+_EXPORT_COLUMNS = [
+    "id", "from_user_id", "to_user_id", "amount", "description",
+    "payment_date", "shamsi_year", "shamsi_month", "created_at",
+]
+
+@router.get("/export")
+def export_payments(
+    current: User = Depends(require_approved_user),
+    fmt: ExportFormat = Query("csv", alias="format"),
+    shamsi_year: int | None = None,
+    shamsi_month: int | None = None,
+    from_: str | None = Query(None, alias="from"),
+    to: str | None = None,
+    scope: str | None = None,
+) -> StreamingResponse:
+    stmt = (
+        select(*(getattr(Payment, c) for c in _EXPORT_COLUMNS))
+        .where(*_list_filters(current, shamsi_year, shamsi_month, from_, to, scope))
+        .order_by(Payment.id.desc())
+    )
+    return export_response(stmt, _EXPORT_COLUMNS, fmt, "payments", read_replica(current.id))
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_read_db, require_approved_user
+from app.api.periods import parse_period
+from app.core.jalali import to_shamsi_year_month
+from app.models.user import User
+from app.schemas.report import MAX_REPORT_MONTHS, MonthlyReport
+from app.services import summary
+
+router = APIRouter()
+
+def _shift(period: tuple[int, int], months: int) -> tuple[int, int]:
+    index = period[0] * 12 + period[1] - 1 + months
+    return index // 12, index % 12 + 1
+
+@router.get("/monthly", response_model=MonthlyReport)
+def monthly_report(
+    db: Session = Depends(get_read_db),
+    current: User = Depends(require_approved_user),
+    from_: str | None = Query(None, alias="from"),
+    to: str | None = None,
+    scope: str | None = None,
+) -> MonthlyReport:
+    if scope == "all" and not current.is_admin:
+        raise HTTPException(status_code=403, detail="Only admins can request group reports")
+    end = parse_period(to, "to") if to else to_shamsi_year_month(date.today())
+    start = parse_period(from_, "from") if from_ else _shift(end, -11)
+    months = (end[0] * 12 + end[1]) - (start[0] * 12 + start[1]) + 1
+    if months < 1:
+        raise HTTPException(status_code=400, detail="from must not be after to")
+    if months > MAX_REPORT_MONTHS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_REPORT_MONTHS} months per report")
+
+    user_id = None if scope == "all" else current.id
+    totals = summary.monthly_totals(db, start, end, user_id)
+    periods = [_shift(start, i) for i in range(months)]
+    zero = Decimal("0.00")
+    series = {f: [totals.get(p, {}).get(f, zero) for p in periods] for f in summary.FIELDS}
+    return MonthlyReport(user_id=user_id, periods=[f"{y}-{m:02d}" for y, m in periods], **series)
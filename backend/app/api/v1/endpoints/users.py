@@ -2,10 +2,15 @@ from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from sqlalchemy import exists, or_, select, func
 
-from app.api.deps import get_db, get_current_user, require_admin
-from app.core.security import hash_password
+from app.api.conditional import bump_data_version
+from app.api.deps import get_db, get_current_user, revoke_user, require_admin
+from app.core.security import hash_password_pooled
+from app.models.expense import Expense, ExpenseParticipant
+from app.models.ledger import BalanceLedger
+from app.models.payment import Payment
+from app.models.summary import MonthlyUserSummary
 from app.models.user import User
 from app.schemas.user import UserCreate, UserOut, UserApproveRequest, UserActiveRequest
 
@@ -24,7 +29,7 @@ def register_user(payload: UserCreate, db: Session = Depends(get_db)) -> User:
         first_name=payload.first_name,
         last_name=payload.last_name,
         username=payload.username,
-        hashed_password=hash_password(payload.password),
+        hashed_password=hash_password_pooled(payload.password),
         is_admin=is_first,
         is_approved=is_first,
         is_active=True,
@@ -35,8 +40,11 @@ def register_user(payload: UserCreate, db: Session = Depends(get_db)) -> User:
     return user
 
 @router.get("/me", response_model=UserOut)
-def me(current: User = Depends(get_current_user)) -> User:
-    return current
+def me(db: Session = Depends(get_db), current: User = Depends(get_current_user)) -> User:
+    user = db.get(User, current.id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
 
 @router.get("", response_model=list[UserOut])
 def list_users(db: Session = Depends(get_db), _: User = Depends(get_current_user)) -> list[User]:
@@ -60,6 +68,8 @@ def approve_user(
         raise HTTPException(status_code=404, detail="User not found")
     user.is_approved = bool(payload.is_approved)
     db.commit()
+    revoke_user(user_id)
+    bump_data_version()
     db.refresh(user)
     return user
 
@@ -75,8 +85,11 @@ def set_user_active(
         raise HTTPException(status_code=404, detail="User not found")
     if user.is_admin:
         raise HTTPException(status_code=400, detail="Admin user cannot be deactivated")
+    if user.is_active and not payload.is_active:
+        user.token_version += 1
     user.is_active = bool(payload.is_active)
     db.commit()
+    revoke_user(user_id)
     db.refresh(user)
     return user
 
@@ -89,7 +102,21 @@ def delete_user(user_id: int, db: Session = Depends(get_db), _: User = Depends(r
         raise HTTPException(status_code=400, detail="Admin user cannot be deleted")
     if user.is_approved:
         raise HTTPException(status_code=400, detail="Approved user cannot be deleted")
+    # The partitioned tables have no foreign keys on MySQL to stop this, and the
+    # ledger/summary rows outlive the raw rows of archived months.
+    referenced = db.scalar(
+        select(
+            exists().where(ExpenseParticipant.user_id == user_id)
+            | exists().where(Expense.payer_id == user_id)
+            | exists().where(or_(Payment.from_user_id == user_id, Payment.to_user_id == user_id))
+            | exists().where(or_(BalanceLedger.user_id == user_id, BalanceLedger.counterparty_id == user_id))
+            | exists().where(MonthlyUserSummary.user_id == user_id)
+        )
+    )
+    if referenced:
+        raise HTTPException(status_code=400, detail="User has expenses, payments or balances")
 
     db.delete(user)
     db.commit()
+    revoke_user(user_id)
     return Response(status_code=204)
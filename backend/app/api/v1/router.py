@@ -4,10 +4,27 @@ from app.api.v1.endpoints.users import router as users_router
 from app.api.v1.endpoints.expenses import router as expenses_router
 from app.api.v1.endpoints.payments import router as payments_router
 from app.api.v1.endpoints.settlements import router as settlements_router
+from app.api.v1.endpoints.reports import router as reports_router
+from app.core.config import settings
 
 api_router = APIRouter()
+
+if settings.ASYNC_DATABASE_URL:
+    from app.api.v1.async_endpoints.users import router as async_users_router
+    from app.api.v1.async_endpoints.expenses import router as async_expenses_router
+    from app.api.v1.async_endpoints.payments import router as async_payments_router
+    from app.api.v1.async_endpoints.settlements import router as async_settlements_router
+
+    # Registered first so these handlers win over the sync ones for the same paths;
+    # the sync routes keep documenting the API.
+    api_router.include_router(async_users_router, prefix="/users", tags=["users"], include_in_schema=False)
+    api_router.include_router(async_expenses_router, prefix="/expenses", tags=["expenses"], include_in_schema=False)
+    api_router.include_router(async_payments_router, prefix="/payments", tags=["payments"], include_in_schema=False)
+    api_router.include_router(async_settlements_router, prefix="/settlements", tags=["settlements"], include_in_schema=False)
+
 api_router.include_router(auth_router, prefix="/auth", tags=["auth"])
 api_router.include_router(users_router, prefix="/users", tags=["users"])
 api_router.include_router(expenses_router, prefix="/expenses", tags=["expenses"])
 api_router.include_router(payments_router, prefix="/payments", tags=["payments"])
 api_router.include_router(settlements_router, prefix="/settlements", tags=["settlements"])
+api_router.include_router(reports_router, prefix="/reports", tags=["reports"])
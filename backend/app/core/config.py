@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -5,11 +7,42 @@ class Settings(BaseSettings):
 
     API_V1_STR: str = "/api/v1"
     DATABASE_URL: str
+    ASYNC_DATABASE_URL: str | None = None
+    DATABASE_REPLICA_URLS: str | None = None
+    ASYNC_DATABASE_REPLICA_URLS: str | None = None
+    READ_YOUR_WRITES_SECONDS: float = 5
+
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_PRE_PING: bool = True
 
     SECRET_KEY: str
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7
 
     JWT_ALGORITHM: str = "HS256"
+    PASSWORD_HASH_WORKERS: int = 2
+    ARGON2_TIME_COST: int = 2
+    ARGON2_MEMORY_COST: int = 19456
+    ARGON2_PARALLELISM: int = 1
+    PBKDF2_ROUNDS: int = 29000
+    AUTH_CACHE_TTL_SECONDS: float = 30
+    AUTH_CACHE_MAX_SIZE: int = 10000
+    RESPONSE_CACHE_TTL_SECONDS: float = 300
+    RESPONSE_CACHE_MAX_SIZE: int = 1024
     CORS_ORIGINS: str = "*"
 
+    SQL_PROFILING: bool = False
+    SQL_SLOW_QUERY_MS: float | None = None
+    METRICS_ENABLED: bool = False
+    METRICS_TOKEN: str | None = None
+
+    SETTLEMENT_STRATEGY: Literal["greedy", "exact", "heuristic"] = "exact"
+    SETTLEMENT_TIME_BUDGET_MS: float | None = 200
+
+    JALALI_TABLE_FROM_YEAR: int = 2000
+    JALALI_TABLE_TO_YEAR: int = 2050
+
 settings = Settings()
@@ -1,13 +1,145 @@
 from __future__ import annotations
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+import random
+import time
 
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.sql.dml import UpdateBase
+
+from app.core import metrics
+from app.core.cache import TTLCache
 from app.core.config import settings
 
 class Base(DeclarativeBase):
     pass
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+_checkout_wait = metrics.histogram("db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection.")
+_checkout_overflow = metrics.counter("db_pool_overflow_checkouts_total", "Checkouts made while the pool was above pool_size.")
+_checkout_timeouts = metrics.counter("db_pool_checkout_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT.")
+
+class _InstrumentedPoolMixin:
+    label = "sync"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            _checkout_timeouts.inc(pool=self.label)
+            raise
+        _checkout_wait.observe(time.perf_counter() - start, pool=self.label)
+        if self.overflow() > 0:
+            _checkout_overflow.inc(pool=self.label)
+        return conn
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    label = "async"
+
+class InstrumentedReplicaQueuePool(InstrumentedQueuePool):
+    label = "sync-replica"
+
+class InstrumentedAsyncReplicaQueuePool(InstrumentedAsyncQueuePool):
+    label = "async-replica"
+
+def _pool_options(url: str, poolclass) -> dict:
+    if url.startswith("sqlite"):
+        return {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+def _urls(value: str | None) -> list[str]:
+    return [u.strip() for u in (value or "").split(",") if u.strip()]
+
+engine = create_engine(settings.DATABASE_URL, **_pool_options(settings.DATABASE_URL, InstrumentedQueuePool))
+
+replica_engines = [
+    create_engine(url, **_pool_options(url, InstrumentedReplicaQueuePool)) for url in _urls(settings.DATABASE_REPLICA_URLS)
+]
+
+async_engine = (
+    create_async_engine(settings.ASYNC_DATABASE_URL, **_pool_options(settings.ASYNC_DATABASE_URL, InstrumentedAsyncQueuePool))
+    if settings.ASYNC_DATABASE_URL
+    else None
+)
+
+async_replica_engines = [
+    create_async_engine(url, **_pool_options(url, InstrumentedAsyncReplicaQueuePool))
+    for url in _urls(settings.ASYNC_DATABASE_REPLICA_URLS)
+]
+
+# user id -> True while reads of that user must still go to the primary
+_recent_writers = TTLCache(maxsize=settings.AUTH_CACHE_MAX_SIZE, ttl=settings.READ_YOUR_WRITES_SECONDS)
+
+# Sessions start on the primary. Setting info["replica"] to an engine (see
+# read_replica) sends plain reads there; flushes and INSERT/UPDATE/DELETE
+# statements keep going to the primary. info["user_id"] is set once the caller
+# is authenticated, so a committed write pins that user to the primary for
+# READ_YOUR_WRITES_SECONDS.
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, *, clause=None, **kw):
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info["wrote"] = True
+        elif self.info.get("replica") is not None:
+            return self.info["replica"]
+        return super().get_bind(mapper, clause=clause, **kw)
+
+@event.listens_for(RoutingSession, "after_commit")
+def _remember_writer(session: Session) -> None:
+    user_id = session.info.get("user_id")
+    if session.info.pop("wrote", False) and user_id is not None:
+        _recent_writers.set(user_id, True)
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _forget_write(session: Session) -> None:
+    session.info.pop("wrote", None)
+
+def read_replica(user_id: int | None, use_async: bool = False) -> Engine | None:
+    if use_async:
+        engines = [e.sync_engine for e in async_replica_engines]
+    else:
+        engines = replica_engines
+    if not engines or (user_id is not None and _recent_writers.get(user_id)):
+        return None
+    return random.choice(engines)
+
+SessionLocal = sessionmaker(bind=engine, class_=RoutingSession, autoflush=False, autocommit=False)
+
+AsyncSessionLocal = (
+    async_sessionmaker(bind=async_engine, sync_session_class=RoutingSession, autoflush=False)
+    if async_engine is not None
+    else None
+)
+
+def _pool_state() -> dict[str, dict[tuple, float]]:
+    pools = [("sync", engine.pool)]
+    pools += [("sync-replica", e.pool) for e in replica_engines]
+    if async_engine is not None:
+        pools.append(("async", async_engine.pool))
+    pools += [("async-replica", e.pool) for e in async_replica_engines]
+    state: dict[str, dict[tuple, float]] = {"size": {}, "checked_out": {}, "overflow": {}}
+    for label, pool in pools:
+        if not isinstance(pool, QueuePool):
+            continue
+        key = (("pool", label),)
+        state["size"][key] = state["size"].get(key, 0) + pool.size()
+        state["checked_out"][key] = state["checked_out"].get(key, 0) + pool.checkedout()
+        state["overflow"][key] = state["overflow"].get(key, 0) + max(pool.overflow(), 0)
+    return state
 
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+metrics.gauge("db_pool_size", "Configured pool size.", lambda: _pool_state()["size"])
+metrics.gauge("db_pool_checked_out", "Connections currently checked out.", lambda: _pool_state()["checked_out"])
+metrics.gauge("db_pool_overflow", "Overflow connections currently open.", lambda: _pool_state()["overflow"])
@@ -1,8 +1,44 @@
 from __future__ import annotations
 
+from bisect import bisect_right
 from datetime import date
+from functools import lru_cache
+
 import jdatetime
 
-def to_shamsi_year_month(d: date) -> tuple[int, int]:
+from app.core.config import settings
+
+# Gregorian ordinals of the first day of every Jalali month covering
+# JALALI_TABLE_FROM_YEAR..JALALI_TABLE_TO_YEAR, plus the month right after, so
+# a lookup is a bisect instead of a jdatetime construction.
+@lru_cache(maxsize=None)
+def _table() -> tuple[list[int], list[tuple[int, int]]]:
+    year = jdatetime.date.fromgregorian(date=date(settings.JALALI_TABLE_FROM_YEAR, 1, 1)).year
+    month = 1
+    end = date(settings.JALALI_TABLE_TO_YEAR + 1, 1, 1)
+    starts: list[int] = []
+    months: list[tuple[int, int]] = []
+    while True:
+        start = jdatetime.date(year, month, 1).togregorian()
+        starts.append(start.toordinal())
+        months.append((year, month))
+        if start >= end:
+            break
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return starts, months
+
+@lru_cache(maxsize=4096)
+def _convert(d: date) -> tuple[int, int]:
     jd = jdatetime.date.fromgregorian(date=d)
     return jd.year, jd.month
+
+# Sortable single-column key, matching the generated `shamsi_period` columns.
+def shamsi_period(shamsi_year: int, shamsi_month: int) -> int:
+    return shamsi_year * 100 + shamsi_month
+
+def to_shamsi_year_month(d: date) -> tuple[int, int]:
+    starts, months = _table()
+    ordinal = d.toordinal()
+    if starts[0] <= ordinal < starts[-1]:
+        return months[bisect_right(starts, ordinal) - 1]
+    return _convert(date.fromordinal(ordinal))
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from typing import Callable
+
+_DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+    return "{" + inner + "}"
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str) -> None:
+        self.name = name
+        self.help = help
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_labels(dict(key))} {value}" for key, value in items]
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, callback: Callable[[], dict[tuple, float]]) -> None:
+        self.name = name
+        self.help = help
+        self._callback = callback
+
+    def samples(self) -> list[str]:
+        return [f"{self.name}{_labels(dict(key))} {value}" for key, value in self._callback().items()]
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: tuple[float, ...] = _DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0, 0])
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = [(key, (list(s[0]), s[1], s[2])) for key, s in self._series.items()]
+        lines: list[str] = []
+        for key, (counts, total, count) in items:
+            labels = dict(key)
+            cumulative = 0
+            for bound, n in zip((*self.buckets, "+Inf"), counts):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_labels({**labels, 'le': str(bound)})} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(labels)} {total}")
+            lines.append(f"{self.name}_count{_labels(labels)} {count}")
+        return lines
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Counter | Gauge | Histogram] = {}
+
+    def register(self, metric):
+        return self._metrics.setdefault(metric.name, metric)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+def counter(name: str, help: str) -> Counter:
+    return registry.register(Counter(name, help))
+
+def gauge(name: str, help: str, callback: Callable[[], dict[tuple, float]]) -> Gauge:
+    return registry.register(Gauge(name, help, callback))
+
+def histogram(name: str, help: str, buckets: tuple[float, ...] = _DEFAULT_BUCKETS) -> Histogram:
+    return registry.register(Histogram(name, help, buckets))
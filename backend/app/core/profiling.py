@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import logging
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core import metrics
+
+logger = logging.getLogger("app.sql")
+
+_TARGET = re.compile(r"\b(?:FROM|INTO|UPDATE)\s+[`\"]?(\w+)", re.IGNORECASE)
+
+_current: ContextVar[RequestStats | None] = ContextVar("sql_request_stats", default=None)
+
+_request_seconds = metrics.histogram("http_request_duration_seconds", "Request latency by route.")
+_request_db_seconds = metrics.histogram("http_request_db_seconds", "Time spent in SQL per request, by route.")
+_request_queries = metrics.counter("http_request_db_queries_total", "SQL statements executed, by route.")
+_slow_queries = metrics.counter("db_slow_queries_total", "Statements slower than SQL_SLOW_QUERY_MS.")
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+@dataclass
+class RequestStats:
+    statements: list[str] = field(default_factory=list)
+    db_seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: str | None = None
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+def redact(parameters) -> str:
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}=?" for k in parameters) + "}"
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f"[{len(parameters)} parameter sets]"
+        return "(" + ", ".join("?" for _ in parameters) + ")"
+    return "?"
+
+def install(engine: Engine, slow_query_ms: float | None = None) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finish(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        stats = _current.get()
+        if stats is not None:
+            stats.statements.append(statement)
+            stats.db_seconds += elapsed
+            if elapsed > stats.slowest_seconds:
+                stats.slowest_seconds = elapsed
+                stats.slowest_statement = statement
+        if slow_query_ms is not None and elapsed * 1000 >= slow_query_ms:
+            _slow_queries.inc()
+            logger.warning(
+                "slow query %.1fms: %s params=%s",
+                elapsed * 1000,
+                re.sub(r"\s+", " ", statement).strip(),
+                redact(parameters),
+            )
+
+@contextmanager
+def capture() -> Iterator[RequestStats]:
+    stats = RequestStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+def check_budget(label: str, stats: RequestStats, budget: int) -> None:
+    if stats.count > budget:
+        listing = "\n".join(f"  {i + 1}. {s}" for i, s in enumerate(stats.statements))
+        raise QueryBudgetExceeded(f"{label} ran {stats.count} SQL statements (budget {budget}):\n{listing}")
+
+def server_timing(stats: RequestStats) -> str:
+    parts = [f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.count} queries"']
+    if stats.slowest_statement is not None:
+        parts.append(f'db-slowest;dur={stats.slowest_seconds * 1000:.1f};desc="{_summary(stats.slowest_statement)}"')
+    return ", ".join(parts)
+
+def observe(route: str, method: str, stats: RequestStats, seconds: float) -> None:
+    labels = {"route": route, "method": method}
+    _request_seconds.observe(seconds, **labels)
+    _request_db_seconds.observe(stats.db_seconds, **labels)
+    _request_queries.inc(stats.count, **labels)
+
+def _summary(statement: str) -> str:
+    match = _TARGET.search(statement)
+    verb = statement.split(None, 1)[0].upper() if statement.strip() else ""
+    return f"{verb} {match.group(1)}" if match else verb
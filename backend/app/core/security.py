@@ -1,14 +1,33 @@
 from __future__ import annotations
 
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
-from jose import jwt
+from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["argon2", "pbkdf2_sha256"],
+    deprecated=["pbkdf2_sha256"],
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+    pbkdf2_sha256__rounds=settings.PBKDF2_ROUNDS,
+)
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+# Per worker and in memory: access tokens issued before a user's entry are
+# rejected here, other workers accept them until they expire. Refresh tokens
+# are revoked through users.token_version instead.
+_claims_revoked_at: dict[int, float] = {}
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -16,7 +35,62 @@ def hash_password(password: str) -> str:
 def verify_password(password: str, hashed: str) -> bool:
     return pwd_context.verify(password, hashed)
 
-def create_access_token(subject: str, expires_minutes: int | None = None) -> str:
-    expire = datetime.now(timezone.utc) + timedelta(minutes=expires_minutes or settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode: dict[str, Any] = {"sub": subject, "exp": expire}
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+def verify_and_update(password: str, hashed: str) -> tuple[bool, str | None]:
+    return pwd_context.verify_and_update(password, hashed)
+
+def _get_executor() -> ProcessPoolExecutor | None:
+    global _executor
+    if settings.PASSWORD_HASH_WORKERS <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            # Not fork: the workers must not inherit the DB engines' pooled connections.
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
+
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+def _offload(func, *args):
+    executor = _get_executor()
+    if executor is None:
+        return func(*args)
+    return executor.submit(func, *args).result()
+
+def hash_password_pooled(password: str) -> str:
+    return _offload(hash_password, password)
+
+def verify_and_update_pooled(password: str, hashed: str) -> tuple[bool, str | None]:
+    return _offload(verify_and_update, password, hashed)
+
+def revoke_claims(user_id: int) -> None:
+    _claims_revoked_at[user_id] = time.time()
+
+def _encode(claims: dict[str, Any], minutes: int) -> str:
+    now = datetime.now(timezone.utc)
+    expire = now + timedelta(minutes=minutes)
+    return jwt.encode(
+        {**claims, "iat": now.timestamp(), "exp": expire}, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM
+    )
+
+def create_access_token(subject: str, expires_minutes: int | None = None, claims: dict[str, Any] | None = None) -> str:
+    to_encode: dict[str, Any] = {"sub": subject, "typ": "access", **(claims or {})}
+    return _encode(to_encode, expires_minutes or settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+
+def create_refresh_token(subject: str, version: int) -> str:
+    return _encode({"sub": subject, "typ": "refresh", "ver": version}, settings.REFRESH_TOKEN_EXPIRE_MINUTES)
+
+def decode_token(token: str, token_type: str) -> tuple[int, dict[str, Any]]:
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+    if payload.get("typ", "access") != token_type:
+        raise JWTError("Unexpected token type")
+    user_id = int(payload.get("sub") or "")
+    if token_type == "access" and payload.get("iat", 0) < _claims_revoked_at.get(user_id, 0):
+        raise JWTError("Token revoked")
+    return user_id, payload
@@ -1,10 +1,22 @@
-from fastapi import FastAPI
+import secrets
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from app.api.v1.router import api_router
+from app.core import metrics, profiling, security
 from app.core.config import settings
+from app.core.database import async_engine, async_replica_engines, engine, replica_engines
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    yield
+    security.shutdown_executor()
 
-app = FastAPI(title="HamHesab API", version="1.0.0")
+app = FastAPI(title="HamHesab API", version="1.0.0", lifespan=lifespan)
 
 origins = [o.strip() for o in settings.CORS_ORIGINS.split(",") if o.strip()]
 app.add_middleware(
@@ -13,7 +25,34 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["X-Total-Count", "X-Total-Pages", "X-Per-Page", "X-Page"],
+    expose_headers=["X-Total-Count", "X-Total-Pages", "X-Per-Page", "X-Page", "X-Next-Cursor", "Server-Timing"],
 )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def prometheus_metrics(request: Request) -> PlainTextResponse:
+        if settings.METRICS_TOKEN:
+            expected = f"Bearer {settings.METRICS_TOKEN}"
+            if not secrets.compare_digest(request.headers.get("authorization", ""), expected):
+                raise HTTPException(status_code=401, detail="Invalid metrics token", headers={"WWW-Authenticate": "Bearer"})
+        return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+if settings.SQL_PROFILING or settings.SQL_SLOW_QUERY_MS is not None:
+    sync_engines = [engine, *replica_engines]
+    sync_engines += [e.sync_engine for e in [async_engine, *async_replica_engines] if e is not None]
+    for sync_engine in sync_engines:
+        profiling.install(sync_engine, settings.SQL_SLOW_QUERY_MS)
+
+if settings.SQL_PROFILING:
+    @app.middleware("http")
+    async def profile_sql(request: Request, call_next):
+        start = time.perf_counter()
+        with profiling.capture() as stats:
+            response = await call_next(request)
+        route = request.scope.get("route")
+        label = route.path if route is not None else "unmatched"
+        response.headers["Server-Timing"] = profiling.server_timing(stats)
+        profiling.observe(label, request.method, stats, time.perf_counter() - start)
+        return response
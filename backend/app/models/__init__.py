@@ -2,5 +2,8 @@ from app.core.database import Base
 from app.models.user import User
 from app.models.expense import Expense, ExpenseParticipant
 from app.models.payment import Payment
+from app.models.ledger import BalanceLedger
+from app.models.summary import MonthlyUserSummary
+from app.models.archive import ArchivedPeriod
 
-__all__ = ["Base", "User", "Expense", "ExpenseParticipant", "Payment"]
+__all__ = ["Base", "User", "Expense", "ExpenseParticipant", "Payment", "BalanceLedger", "MonthlyUserSummary", "ArchivedPeriod"]
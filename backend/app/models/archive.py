@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+# Shamsi months whose expenses and payments were deleted by the archival
+# command. Their balance_ledger and monthly_user_summary rows are kept and are
+# the source of truth for those months from then on.
+class ArchivedPeriod(Base):
+    __tablename__ = "archived_periods"
+
+    shamsi_period: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    expenses: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    payments: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
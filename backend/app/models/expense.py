@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import date, datetime
 from decimal import Decimal
 
-from sqlalchemy import BigInteger, Date, DateTime, ForeignKey, Numeric, String, func, Integer
+from sqlalchemy import BigInteger, Computed, Date, DateTime, ForeignKey, Index, Numeric, String, func, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -20,6 +20,7 @@ class Expense(Base):
     expense_date: Mapped[date] = mapped_column(Date, nullable=False)
     shamsi_year: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
     shamsi_month: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    shamsi_period: Mapped[int] = mapped_column(Integer, Computed("shamsi_year * 100 + shamsi_month", persisted=True))
 
     status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")
 
@@ -29,14 +30,23 @@ class Expense(Base):
         "ExpenseParticipant",
         back_populates="expense",
         cascade="all, delete-orphan",
-        passive_deletes=True,
     )
 
+    __table_args__ = (
+        Index("ix_expenses_shamsi_period", "shamsi_period", "id"),
+        Index("ix_expenses_amount", "amount"),
+        Index("ft_expenses_description", "description", mysql_prefix="FULLTEXT", mysql_with_parser="ngram"),
+    )
+
+# On MySQL this table and `payments` are RANGE-partitioned by `shamsi_period`
+# (migration 0007), so the foreign keys below exist only in the ORM metadata and
+# the period is copied from the expense to be part of the primary key.
 class ExpenseParticipant(Base):
     __tablename__ = "expense_participants"
 
     expense_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("expenses.id", ondelete="CASCADE"), primary_key=True)
-    user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.id", ondelete="RESTRICT"), primary_key=True, index=True)
+    user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.id", ondelete="RESTRICT"), primary_key=True)
+    shamsi_period: Mapped[int] = mapped_column(Integer, nullable=False)
 
     share_amount: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
 
@@ -44,3 +54,7 @@ class ExpenseParticipant(Base):
     approved_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     expense: Mapped["Expense"] = relationship("Expense", back_populates="participants")
+
+    __table_args__ = (
+        Index("ix_expense_participants_user_expense", "user_id", "expense_id"),
+    )
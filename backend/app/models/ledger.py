@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+from sqlalchemy import BigInteger, Computed, ForeignKey, Index, Integer, Numeric
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+# How much `counterparty_id` owes `user_id` from one Shamsi month of approved
+# expenses and payments. Each movement is stored in both directions.
+class BalanceLedger(Base):
+    __tablename__ = "balance_ledger"
+
+    user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.id", ondelete="RESTRICT"), primary_key=True)
+    counterparty_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.id", ondelete="RESTRICT"), primary_key=True)
+    shamsi_year: Mapped[int] = mapped_column(Integer, primary_key=True)
+    shamsi_month: Mapped[int] = mapped_column(Integer, primary_key=True)
+    shamsi_period: Mapped[int] = mapped_column(Integer, Computed("shamsi_year * 100 + shamsi_month", persisted=True))
+
+    amount: Mapped[Decimal] = mapped_column(Numeric(16, 2), nullable=False, default=Decimal("0.00"))
+
+    __table_args__ = (
+        Index("ix_balance_ledger_shamsi_period", "shamsi_period", "user_id"),
+        Index("ix_balance_ledger_user_period", "user_id", "shamsi_period", "counterparty_id"),
+    )
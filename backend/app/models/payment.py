@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import date, datetime
 from decimal import Decimal
 
-from sqlalchemy import BigInteger, Date, DateTime, ForeignKey, Numeric, String, func, Integer
+from sqlalchemy import BigInteger, Computed, Date, DateTime, ForeignKey, Index, Numeric, String, func, Integer
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.database import Base
@@ -22,5 +22,10 @@ class Payment(Base):
     payment_date: Mapped[date] = mapped_column(Date, nullable=False)
     shamsi_year: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
     shamsi_month: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    shamsi_period: Mapped[int] = mapped_column(Integer, Computed("shamsi_year * 100 + shamsi_month", persisted=True))
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_payments_shamsi_period", "shamsi_period", "id"),
+    )
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+from sqlalchemy import BigInteger, Computed, ForeignKey, Index, Integer, Numeric
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+# Per-user totals for one Shamsi month of approved expenses and payments.
+# `owed` is the month's net: positive when others owe the user.
+class MonthlyUserSummary(Base):
+    __tablename__ = "monthly_user_summary"
+
+    user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.id", ondelete="RESTRICT"), primary_key=True)
+    shamsi_year: Mapped[int] = mapped_column(Integer, primary_key=True)
+    shamsi_month: Mapped[int] = mapped_column(Integer, primary_key=True)
+    shamsi_period: Mapped[int] = mapped_column(Integer, Computed("shamsi_year * 100 + shamsi_month", persisted=True))
+
+    spent: Mapped[Decimal] = mapped_column(Numeric(16, 2), nullable=False, default=Decimal("0.00"))
+    paid: Mapped[Decimal] = mapped_column(Numeric(16, 2), nullable=False, default=Decimal("0.00"))
+    payments_sent: Mapped[Decimal] = mapped_column(Numeric(16, 2), nullable=False, default=Decimal("0.00"))
+    payments_received: Mapped[Decimal] = mapped_column(Numeric(16, 2), nullable=False, default=Decimal("0.00"))
+    owed: Mapped[Decimal] = mapped_column(Numeric(16, 2), nullable=False, default=Decimal("0.00"))
+
+    __table_args__ = (
+        Index("ix_monthly_user_summary_shamsi_period", "shamsi_period", "user_id"),
+    )
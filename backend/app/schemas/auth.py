@@ -2,8 +2,12 @@ from pydantic import BaseModel
 
 class Token(BaseModel):
     access_token: str
+    refresh_token: str
     token_type: str = "bearer"
 
 class LoginRequest(BaseModel):
     username: str
     password: str
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
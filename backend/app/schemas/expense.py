@@ -1,12 +1,38 @@
 from datetime import date, datetime
 from decimal import Decimal
-from pydantic import BaseModel, Field
+from typing import Annotated, Literal
+from pydantic import AfterValidator, BaseModel, Field, model_validator
+
+MAX_BATCH_SIZE = 1000
+
+# pydantic skips max_digits/decimal_places for exponents beyond the decimal
+# context (e.g. 1e-5000000), so the exponent is bounded explicitly as well.
+def _places(limit: int):
+    def check(value: Decimal) -> Decimal:
+        if value.as_tuple().exponent < -limit and value != value.quantize(Decimal(1).scaleb(-limit)):
+            raise ValueError(f"Decimal input should have no more than {limit} decimal places")
+        return value
+    return AfterValidator(check)
+
+Weight = Annotated[Decimal, Field(gt=0, max_digits=12, decimal_places=6), _places(6)]
+ShareAmount = Annotated[Decimal, Field(ge=0, max_digits=12, decimal_places=2), _places(2)]
 
 class ExpenseCreate(BaseModel):
     amount: Decimal = Field(gt=0)
     description: str | None = Field(default=None, max_length=500)
     expense_date: date
     participant_user_ids: list[int] = Field(min_length=1)
+    split: Literal["equal", "weighted", "exact"] = "equal"
+    weights: dict[int, Weight] | None = None
+    share_amounts: dict[int, ShareAmount] | None = None
+
+    @model_validator(mode="after")
+    def _check_split_inputs(self) -> "ExpenseCreate":
+        if self.weights is not None and self.split != "weighted":
+            raise ValueError("weights are only allowed with split=weighted")
+        if self.share_amounts is not None and self.split != "exact":
+            raise ValueError("share_amounts are only allowed with split=exact")
+        return self
 
 class ExpenseParticipantOut(BaseModel):
     user_id: int
@@ -35,3 +61,19 @@ class ExpenseApproveResponse(BaseModel):
     user_id: int
     approved: bool
     expense_status: str
+
+class ExpenseBatchResult(BaseModel):
+    index: int
+    ok: bool
+    expense_id: int | None = None
+    expense_status: str | None = None
+    error: str | None = None
+
+class ExpenseBulkApproveRequest(BaseModel):
+    expense_ids: list[int] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+class ExpenseBulkApproveResult(BaseModel):
+    expense_id: int
+    ok: bool
+    expense_status: str | None = None
+    error: str | None = None
@@ -2,6 +2,8 @@ from datetime import date, datetime
 from decimal import Decimal
 from pydantic import BaseModel, Field
 
+MAX_BATCH_SIZE = 1000
+
 class PaymentCreate(BaseModel):
     to_user_id: int
     amount: Decimal = Field(gt=0)
@@ -20,3 +22,9 @@ class PaymentOut(BaseModel):
     created_at: datetime
     class Config:
         from_attributes = True
+
+class PaymentBatchResult(BaseModel):
+    index: int
+    ok: bool
+    payment_id: int | None = None
+    error: str | None = None
@@ -0,0 +1,13 @@
+from decimal import Decimal
+from pydantic import BaseModel
+
+MAX_REPORT_MONTHS = 120
+
+class MonthlyReport(BaseModel):
+    user_id: int | None
+    periods: list[str]
+    spent: list[Decimal]
+    paid: list[Decimal]
+    payments_sent: list[Decimal]
+    payments_received: list[Decimal]
+    owed: list[Decimal]
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.orm import Session
+
+from app.core.jalali import shamsi_period
+from app.models.archive import ArchivedPeriod
+from app.models.expense import Expense, ExpenseParticipant
+from app.models.payment import Payment
+from app.services import ledger, summary
+
+# RANGE-partitioned by shamsi_period on MySQL, one partition per Shamsi year
+# named p<year> plus a catch-all pmax (see migration 0007).
+PARTITIONED_TABLES = ("expense_participants", "payments")
+
+# Months before `before` whose expenses are all approved, and those that still
+# have pending ones. Balances don't have to be zero: the month's ledger and
+# summary rows stay, so settlements still carry whatever is owed.
+def candidates(db: Session, before: int) -> tuple[list[int], list[int]]:
+    periods = set(db.scalars(select(Expense.shamsi_period).where(Expense.shamsi_period < before).distinct()))
+    periods |= set(db.scalars(select(Payment.shamsi_period).where(Payment.shamsi_period < before).distinct()))
+    pending = set(
+        db.scalars(
+            select(Expense.shamsi_period)
+            .where(Expense.shamsi_period < before, Expense.status != "approved")
+            .distinct()
+        )
+    )
+    return sorted(periods - pending), sorted(pending)
+
+def drifted_periods(db: Session) -> set[int]:
+    periods = {shamsi_period(y, m) for _, _, y, m in ledger.drift(db)}
+    periods |= {shamsi_period(y, m) for _, y, m in summary.drift(db)}
+    return periods
+
+# The ledger and summary rows already hold everything settlements and reports
+# need for the month, so only the raw rows go.
+def archive_period(db: Session, period: int) -> tuple[int, int]:
+    db.execute(delete(ExpenseParticipant).where(ExpenseParticipant.shamsi_period == period))
+    expenses = db.execute(delete(Expense).where(Expense.shamsi_period == period)).rowcount
+    payments = db.execute(delete(Payment).where(Payment.shamsi_period == period)).rowcount
+    row = db.get(ArchivedPeriod, period)
+    if row is None:
+        db.add(ArchivedPeriod(shamsi_period=period, expenses=expenses, payments=payments))
+    else:
+        row.expenses += expenses
+        row.payments += payments
+    return expenses, payments
+
+def _partition_years(db: Session, table: str) -> list[int] | None:
+    names = db.scalars(
+        text(
+            "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL"
+        ),
+        {"table": table},
+    ).all()
+    if "pmax" not in names:
+        return None
+    return sorted(int(name[1:]) for name in names if name != "pmax")
+
+# ALTER TABLE ... PARTITION commits implicitly, so these run outside the
+# archival transactions.
+def ensure_partitions(db: Session, through_year: int) -> list[str]:
+    if db.get_bind().dialect.name != "mysql":
+        return []
+    added = []
+    for table in PARTITIONED_TABLES:
+        years = _partition_years(db, table)
+        if not years:
+            continue
+        new = range(years[-1] + 1, through_year + 1)
+        if not new:
+            continue
+        parts = [f"PARTITION p{y} VALUES LESS THAN ({shamsi_period(y + 1, 0)})" for y in new]
+        parts.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+        db.execute(text(f"ALTER TABLE {table} REORGANIZE PARTITION pmax INTO ({', '.join(parts)})"))
+        added.extend(f"{table}.p{y}" for y in new)
+    return added
+
+def drop_empty_partitions(db: Session, before: int) -> list[str]:
+    if db.get_bind().dialect.name != "mysql":
+        return []
+    dropped = []
+    for table in PARTITIONED_TABLES:
+        years = _partition_years(db, table)
+        if not years:
+            continue
+        # Keep at least one year partition so the table stays RANGE-partitioned.
+        for year in years[:-1]:
+            if shamsi_period(year + 1, 0) > before:
+                break
+            if db.scalar(text(f"SELECT 1 FROM {table} PARTITION (p{year}) LIMIT 1")) is not None:
+                break
+            db.execute(text(f"ALTER TABLE {table} DROP PARTITION p{year}"))
+            dropped.append(f"{table}.p{year}")
+    return dropped
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Iterable
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.jalali import shamsi_period
+from app.models.archive import ArchivedPeriod
+from app.models.expense import Expense, ExpenseParticipant
+from app.models.ledger import BalanceLedger
+from app.models.payment import Payment
+
+LedgerKey = tuple[int, int, int, int]
+
+def _period_filter(shamsi_year: int, shamsi_month: int, since: tuple[int, int] | None = None) -> list:
+    filters = [BalanceLedger.shamsi_period <= shamsi_period(shamsi_year, shamsi_month)]
+    if since is not None:
+        filters.append(BalanceLedger.shamsi_period >= shamsi_period(*since))
+    return filters
+
+def _add_pair(deltas: dict[LedgerKey, Decimal], creditor: int, debtor: int, year: int, month: int, amount: Decimal) -> None:
+    if creditor == debtor or not amount:
+        return
+    deltas[(creditor, debtor, year, month)] += amount
+    deltas[(debtor, creditor, year, month)] -= amount
+
+def expense_deltas(expense: Expense, participants: Iterable[ExpenseParticipant] | None = None) -> dict[LedgerKey, Decimal]:
+    deltas: dict[LedgerKey, Decimal] = defaultdict(Decimal)
+    for p in expense.participants if participants is None else participants:
+        _add_pair(deltas, expense.payer_id, p.user_id, expense.shamsi_year, expense.shamsi_month, Decimal(p.share_amount))
+    return deltas
+
+def payment_deltas(payment: Payment) -> dict[LedgerKey, Decimal]:
+    deltas: dict[LedgerKey, Decimal] = defaultdict(Decimal)
+    _add_pair(deltas, payment.from_user_id, payment.to_user_id, payment.shamsi_year, payment.shamsi_month, Decimal(payment.amount))
+    return deltas
+
+def _upsert(db: Session, rows: list[dict]) -> None:
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        stmt = mysql.insert(BalanceLedger)
+        stmt = stmt.on_duplicate_key_update(amount=BalanceLedger.amount + stmt.inserted.amount)
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(BalanceLedger)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                BalanceLedger.user_id,
+                BalanceLedger.counterparty_id,
+                BalanceLedger.shamsi_year,
+                BalanceLedger.shamsi_month,
+            ],
+            set_={"amount": BalanceLedger.amount + stmt.excluded.amount},
+        )
+    else:
+        for row in rows:
+            updated = db.execute(
+                update(BalanceLedger)
+                .where(
+                    BalanceLedger.user_id == row["user_id"],
+                    BalanceLedger.counterparty_id == row["counterparty_id"],
+                    BalanceLedger.shamsi_year == row["shamsi_year"],
+                    BalanceLedger.shamsi_month == row["shamsi_month"],
+                )
+                .values(amount=BalanceLedger.amount + row["amount"])
+            )
+            if not updated.rowcount:
+                db.add(BalanceLedger(**row))
+        return
+    db.execute(stmt, rows)
+
+def apply_deltas(db: Session, deltas: dict[LedgerKey, Decimal], sign: int = 1) -> None:
+    rows = [
+        {"user_id": u, "counterparty_id": c, "shamsi_year": y, "shamsi_month": m, "amount": amount * sign}
+        for (u, c, y, m), amount in deltas.items()
+        if amount
+    ]
+    if rows:
+        _upsert(db, rows)
+
+def record_expense(db: Session, expense: Expense, participants: Iterable[ExpenseParticipant] | None = None) -> None:
+    apply_deltas(db, expense_deltas(expense, participants))
+
+def revert_expense(db: Session, expense: Expense) -> None:
+    if expense.status == "approved":
+        apply_deltas(db, expense_deltas(expense), sign=-1)
+
+def record_payment(db: Session, payment: Payment) -> None:
+    apply_deltas(db, payment_deltas(payment))
+
+def _merge(parts: Iterable[dict[LedgerKey, Decimal]]) -> dict[LedgerKey, Decimal]:
+    merged: dict[LedgerKey, Decimal] = defaultdict(Decimal)
+    for deltas in parts:
+        for key, amount in deltas.items():
+            merged[key] += amount
+    return merged
+
+def record_expenses(db: Session, expenses: Iterable[Expense]) -> None:
+    apply_deltas(db, _merge(expense_deltas(e) for e in expenses))
+
+def record_payments(db: Session, payments: Iterable[Payment]) -> None:
+    apply_deltas(db, _merge(payment_deltas(p) for p in payments))
+
+def _to_cents(total) -> int:
+    return int((Decimal(total) * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+def net_balances(db: Session, shamsi_year: int, shamsi_month: int, since: tuple[int, int] | None = None) -> dict[int, int]:
+    rows = db.execute(
+        select(BalanceLedger.user_id, func.sum(BalanceLedger.amount))
+        .where(*_period_filter(shamsi_year, shamsi_month, since))
+        .group_by(BalanceLedger.user_id)
+    ).all()
+    return {uid: _to_cents(total) for uid, total in rows}
+
+def counterparty_balances(
+    db: Session,
+    user_id: int,
+    shamsi_year: int,
+    shamsi_month: int,
+    since: tuple[int, int] | None = None,
+) -> dict[int, int]:
+    rows = db.execute(
+        select(BalanceLedger.counterparty_id, func.sum(BalanceLedger.amount))
+        .where(BalanceLedger.user_id == user_id, *_period_filter(shamsi_year, shamsi_month, since))
+        .group_by(BalanceLedger.counterparty_id)
+    ).all()
+    return {uid: _to_cents(total) for uid, total in rows}
+
+# Archived months have no raw rows left, so their stored rows are taken as is.
+def compute_from_raw(db: Session) -> dict[LedgerKey, Decimal]:
+    archived = select(ArchivedPeriod.shamsi_period)
+    deltas: dict[LedgerKey, Decimal] = defaultdict(Decimal)
+    shares = db.execute(
+        select(
+            Expense.payer_id,
+            ExpenseParticipant.user_id,
+            Expense.shamsi_year,
+            Expense.shamsi_month,
+            func.sum(ExpenseParticipant.share_amount),
+        )
+        .join(ExpenseParticipant, ExpenseParticipant.expense_id == Expense.id)
+        .where(
+            Expense.status == "approved",
+            ExpenseParticipant.user_id != Expense.payer_id,
+            Expense.shamsi_period.not_in(archived),
+        )
+        .group_by(Expense.payer_id, ExpenseParticipant.user_id, Expense.shamsi_year, Expense.shamsi_month)
+    )
+    for payer_id, user_id, year, month, total in shares:
+        _add_pair(deltas, payer_id, user_id, year, month, Decimal(total))
+    payments = db.execute(
+        select(
+            Payment.from_user_id,
+            Payment.to_user_id,
+            Payment.shamsi_year,
+            Payment.shamsi_month,
+            func.sum(Payment.amount),
+        )
+        .where(Payment.shamsi_period.not_in(archived))
+        .group_by(Payment.from_user_id, Payment.to_user_id, Payment.shamsi_year, Payment.shamsi_month)
+    )
+    for from_id, to_id, year, month, total in payments:
+        _add_pair(deltas, from_id, to_id, year, month, Decimal(total))
+    for key, amount in stored(db, archived_only=True).items():
+        deltas[key] += amount
+    return {key: amount for key, amount in deltas.items() if amount}
+
+def stored(db: Session, archived_only: bool = False) -> dict[LedgerKey, Decimal]:
+    stmt = select(
+        BalanceLedger.user_id,
+        BalanceLedger.counterparty_id,
+        BalanceLedger.shamsi_year,
+        BalanceLedger.shamsi_month,
+        BalanceLedger.amount,
+    )
+    if archived_only:
+        stmt = stmt.where(BalanceLedger.shamsi_period.in_(select(ArchivedPeriod.shamsi_period)))
+    rows = db.execute(stmt).all()
+    return {(u, c, y, m): Decimal(amount) for u, c, y, m, amount in rows if amount}
+
+def drift(db: Session) -> dict[LedgerKey, tuple[Decimal, Decimal]]:
+    expected = compute_from_raw(db)
+    actual = stored(db)
+    zero = Decimal("0.00")
+    return {
+        key: (actual.get(key, zero), expected.get(key, zero))
+        for key in expected.keys() | actual.keys()
+        if actual.get(key, zero) != expected.get(key, zero)
+    }
+
+def rebuild(db: Session) -> int:
+    expected = compute_from_raw(db)
+    db.execute(delete(BalanceLedger))
+    apply_deltas(db, expected)
+    return len(expected)
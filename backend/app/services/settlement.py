@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import time
+from collections import defaultdict
+from typing import Callable
+
+# Balances and transfer amounts are integer cents; positive means the user is owed.
+Transfer = tuple[int, int, int]
+Strategy = Callable[[dict[int, int], float | None], list[Transfer]]
+
+EXACT_MAX_USERS = 16
+
+class _BudgetExceeded(Exception):
+    pass
+
+def greedy(balances: dict[int, int], deadline: float | None = None) -> list[Transfer]:
+    debtors = [(uid, -v) for uid, v in balances.items() if v < 0]
+    creditors = [(uid, v) for uid, v in balances.items() if v > 0]
+    debtors.sort(key=lambda x: x[1], reverse=True)
+    creditors.sort(key=lambda x: x[1], reverse=True)
+
+    transfers: list[Transfer] = []
+    i = j = 0
+    while i < len(debtors) and j < len(creditors):
+        (d_uid, d_amt), (c_uid, c_amt) = debtors[i], creditors[j]
+        x = min(d_amt, c_amt)
+        transfers.append((d_uid, c_uid, x))
+        debtors[i], creditors[j] = (d_uid, d_amt - x), (c_uid, c_amt - x)
+        if d_amt == x:
+            i += 1
+        if c_amt == x:
+            j += 1
+    return transfers
+
+def _cancel_pairs(cents: dict[int, int]) -> tuple[list[Transfer], dict[int, int]]:
+    # A debtor and creditor with equal amounts always form their own group in some optimal solution.
+    creditors: dict[int, list[int]] = defaultdict(list)
+    for uid, v in sorted(cents.items()):
+        if v > 0:
+            creditors[v].append(uid)
+    transfers = []
+    rest = dict(cents)
+    for uid, v in sorted(cents.items()):
+        if v < 0 and creditors.get(-v):
+            c_uid = creditors[-v].pop()
+            transfers.append((uid, c_uid, -v))
+            del rest[uid], rest[c_uid]
+    return transfers, rest
+
+def _cancel_triples(cents: dict[int, int], deadline: float | None) -> tuple[list[Transfer], dict[int, int]]:
+    by_value: dict[int, set[int]] = defaultdict(set)
+    for uid, v in cents.items():
+        by_value[v].add(uid)
+    transfers = []
+    rest = dict(cents)
+    uids = sorted(cents)
+    for a_idx, a in enumerate(uids):
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+        for b in uids[a_idx + 1:]:
+            if a not in rest:
+                break
+            if b not in rest:
+                continue
+            target = -(rest[a] + rest[b])
+            c = next((uid for uid in by_value.get(target, ()) if uid != a and uid != b), None)
+            if c is None:
+                continue
+            group = {uid: rest.pop(uid) for uid in (a, b, c)}
+            for uid, v in group.items():
+                by_value[v].discard(uid)
+            transfers.extend(greedy(group))
+    return transfers, rest
+
+def _zero_sum_groups(cents: dict[int, int], deadline: float | None) -> list[list[int]]:
+    uids = list(cents)
+    values = [cents[uid] for uid in uids]
+    n = len(uids)
+    full = (1 << n) - 1
+    sums = [0] * (full + 1)
+    best = [0] * (full + 1)
+    for mask in range(1, full + 1):
+        if deadline is not None and not mask & 0x3FF and time.perf_counter() > deadline:
+            raise _BudgetExceeded
+        low = mask & -mask
+        sums[mask] = sums[mask ^ low] + values[low.bit_length() - 1]
+        top = 0
+        rest = mask
+        while rest:
+            bit = rest & -rest
+            rest ^= bit
+            if best[mask ^ bit] > top:
+                top = best[mask ^ bit]
+        best[mask] = top + (sums[mask] == 0)
+
+    groups: list[list[int]] = []
+    current: list[int] = []
+    mask = full
+    while mask:
+        target = best[mask] - (sums[mask] == 0)
+        rest = mask
+        while rest:
+            bit = rest & -rest
+            rest ^= bit
+            if best[mask ^ bit] == target:
+                break
+        current.append(uids[bit.bit_length() - 1])
+        mask ^= bit
+        if sums[mask] == 0:
+            groups.append(current)
+            current = []
+    return groups
+
+def exact(balances: dict[int, int], deadline: float | None = None) -> list[Transfer]:
+    cents = {uid: v for uid, v in balances.items() if v}
+    if sum(cents.values()) != 0:
+        return greedy(balances, deadline)
+    transfers, rest = _cancel_pairs(cents)
+    if len(rest) > EXACT_MAX_USERS:
+        return heuristic(balances, deadline)
+    try:
+        groups = _zero_sum_groups(rest, deadline)
+    except _BudgetExceeded:
+        return heuristic(balances, deadline)
+    for group in groups:
+        transfers.extend(greedy({uid: rest[uid] for uid in group}))
+    return transfers
+
+def heuristic(balances: dict[int, int], deadline: float | None = None) -> list[Transfer]:
+    cents = {uid: v for uid, v in balances.items() if v}
+    if sum(cents.values()) != 0:
+        return greedy(balances, deadline)
+    transfers, rest = _cancel_pairs(cents)
+    triples, rest = _cancel_triples(rest, deadline)
+    transfers.extend(triples)
+    transfers.extend(greedy(rest))
+    return transfers
+
+STRATEGIES: dict[str, Strategy] = {
+    "greedy": greedy,
+    "exact": exact,
+    "heuristic": heuristic,
+}
+
+def settle(balances: dict[int, int], strategy: str = "exact", time_budget_ms: float | None = None) -> list[Transfer]:
+    deadline = time.perf_counter() + time_budget_ms / 1000 if time_budget_ms is not None else None
+    return STRATEGIES[strategy](balances, deadline)
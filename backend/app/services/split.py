@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from decimal import Decimal, ROUND_HALF_UP
+
+def to_cents(amount: Decimal) -> int:
+    return int(Decimal(amount).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP) * 100)
+
+def from_cents(cents: int) -> Decimal:
+    return (Decimal(cents) / 100).quantize(Decimal("0.01"))
+
+# Matches the decimal_places allowed for ExpenseCreate.weights; finer digits are dropped.
+WEIGHT_PLACES = 6
+
+def _integer_weights(weights: list[Decimal]) -> list[int]:
+    places = max((max(-Decimal(w).as_tuple().exponent, 0) for w in weights), default=0)
+    scale = 10 ** min(places, WEIGHT_PLACES)
+    return [int(Decimal(w) * scale) for w in weights]
+
+# Hamilton / largest-remainder: floor every quota, then hand the leftover units
+# to the largest remainders (earlier entries win ties), so shares always sum to total.
+def largest_remainder(total: int, weights: list[int]) -> list[int]:
+    weight_sum = sum(weights)
+    quotas = [divmod(total * w, weight_sum) for w in weights]
+    shares = [q for q, _ in quotas]
+    leftover = total - sum(shares)
+    for i in sorted(range(len(weights)), key=lambda i: (-quotas[i][1], i))[:leftover]:
+        shares[i] += 1
+    return shares
+
+def split_amount(amount: Decimal, weights: list[Decimal]) -> list[Decimal]:
+    return [from_cents(c) for c in largest_remainder(to_cents(amount), _integer_weights(weights))]
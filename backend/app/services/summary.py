@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from decimal import Decimal
+from typing import Iterable
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.jalali import shamsi_period
+from app.models.archive import ArchivedPeriod
+from app.models.expense import Expense, ExpenseParticipant
+from app.models.payment import Payment
+from app.models.summary import MonthlyUserSummary
+from app.services import ledger
+
+SummaryKey = tuple[int, int, int]
+Deltas = dict[SummaryKey, dict[str, Decimal]]
+
+FIELDS = ("spent", "paid", "payments_sent", "payments_received", "owed")
+
+def _new_deltas() -> Deltas:
+    return defaultdict(lambda: defaultdict(Decimal))
+
+def expense_deltas(expense: Expense, participants: Iterable[ExpenseParticipant] | None = None) -> Deltas:
+    deltas = _new_deltas()
+    y, m = expense.shamsi_year, expense.shamsi_month
+    deltas[(expense.payer_id, y, m)]["paid"] += Decimal(expense.amount)
+    for p in expense.participants if participants is None else participants:
+        share = Decimal(p.share_amount)
+        deltas[(p.user_id, y, m)]["spent"] += share
+        if p.user_id != expense.payer_id:
+            deltas[(expense.payer_id, y, m)]["owed"] += share
+            deltas[(p.user_id, y, m)]["owed"] -= share
+    return deltas
+
+def payment_deltas(payment: Payment) -> Deltas:
+    deltas = _new_deltas()
+    amount = Decimal(payment.amount)
+    y, m = payment.shamsi_year, payment.shamsi_month
+    deltas[(payment.from_user_id, y, m)]["payments_sent"] += amount
+    deltas[(payment.from_user_id, y, m)]["owed"] += amount
+    deltas[(payment.to_user_id, y, m)]["payments_received"] += amount
+    deltas[(payment.to_user_id, y, m)]["owed"] -= amount
+    return deltas
+
+def _upsert(db: Session, rows: list[dict]) -> None:
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        stmt = mysql.insert(MonthlyUserSummary)
+        stmt = stmt.on_duplicate_key_update(
+            **{f: getattr(MonthlyUserSummary, f) + getattr(stmt.inserted, f) for f in FIELDS}
+        )
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(MonthlyUserSummary)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[MonthlyUserSummary.user_id, MonthlyUserSummary.shamsi_year, MonthlyUserSummary.shamsi_month],
+            set_={f: getattr(MonthlyUserSummary, f) + getattr(stmt.excluded, f) for f in FIELDS},
+        )
+    else:
+        for row in rows:
+            updated = db.execute(
+                update(MonthlyUserSummary)
+                .where(
+                    MonthlyUserSummary.user_id == row["user_id"],
+                    MonthlyUserSummary.shamsi_year == row["shamsi_year"],
+                    MonthlyUserSummary.shamsi_month == row["shamsi_month"],
+                )
+                .values(**{f: getattr(MonthlyUserSummary, f) + row[f] for f in FIELDS})
+            )
+            if not updated.rowcount:
+                db.add(MonthlyUserSummary(**row))
+        return
+    db.execute(stmt, rows)
+
+def apply_deltas(db: Session, deltas: Deltas, sign: int = 1) -> None:
+    rows = [
+        {"user_id": u, "shamsi_year": y, "shamsi_month": m, **{f: values.get(f, Decimal("0")) * sign for f in FIELDS}}
+        for (u, y, m), values in deltas.items()
+        if any(values.values())
+    ]
+    if rows:
+        _upsert(db, rows)
+
+def _merge(parts: Iterable[Deltas]) -> Deltas:
+    merged = _new_deltas()
+    for deltas in parts:
+        for key, values in deltas.items():
+            for field, amount in values.items():
+                merged[key][field] += amount
+    return merged
+
+def record_expense(db: Session, expense: Expense, participants: Iterable[ExpenseParticipant] | None = None) -> None:
+    apply_deltas(db, expense_deltas(expense, participants))
+
+def revert_expense(db: Session, expense: Expense) -> None:
+    if expense.status == "approved":
+        apply_deltas(db, expense_deltas(expense), sign=-1)
+
+def record_payment(db: Session, payment: Payment) -> None:
+    apply_deltas(db, payment_deltas(payment))
+
+def record_expenses(db: Session, expenses: Iterable[Expense]) -> None:
+    apply_deltas(db, _merge(expense_deltas(e) for e in expenses))
+
+def record_payments(db: Session, payments: Iterable[Payment]) -> None:
+    apply_deltas(db, _merge(payment_deltas(p) for p in payments))
+
+def _period_range(start: tuple[int, int], end: tuple[int, int]):
+    return MonthlyUserSummary.shamsi_period.between(shamsi_period(*start), shamsi_period(*end))
+
+def monthly_totals(
+    db: Session, start: tuple[int, int], end: tuple[int, int], user_id: int | None = None,
+) -> dict[tuple[int, int], dict[str, Decimal]]:
+    stmt = (
+        select(
+            MonthlyUserSummary.shamsi_year,
+            MonthlyUserSummary.shamsi_month,
+            *(func.sum(getattr(MonthlyUserSummary, f)) for f in FIELDS),
+        )
+        .where(_period_range(start, end))
+        .group_by(MonthlyUserSummary.shamsi_year, MonthlyUserSummary.shamsi_month)
+    )
+    if user_id is not None:
+        stmt = stmt.where(MonthlyUserSummary.user_id == user_id)
+    return {(y, m): dict(zip(FIELDS, (Decimal(v) + 0 for v in values))) for y, m, *values in db.execute(stmt)}
+
+# Archived months have no raw rows left, so their stored rows are taken as is.
+def compute_from_raw(db: Session) -> Deltas:
+    archived = select(ArchivedPeriod.shamsi_period)
+    archived_periods = set(db.scalars(archived))
+    deltas = _new_deltas()
+    approved = (Expense.status == "approved", Expense.shamsi_period.not_in(archived))
+    for payer_id, y, m, total in db.execute(
+        select(Expense.payer_id, Expense.shamsi_year, Expense.shamsi_month, func.sum(Expense.amount))
+        .where(*approved)
+        .group_by(Expense.payer_id, Expense.shamsi_year, Expense.shamsi_month)
+    ):
+        deltas[(payer_id, y, m)]["paid"] += Decimal(total)
+    for user_id, y, m, total in db.execute(
+        select(ExpenseParticipant.user_id, Expense.shamsi_year, Expense.shamsi_month, func.sum(ExpenseParticipant.share_amount))
+        .join(Expense, Expense.id == ExpenseParticipant.expense_id)
+        .where(*approved)
+        .group_by(ExpenseParticipant.user_id, Expense.shamsi_year, Expense.shamsi_month)
+    ):
+        deltas[(user_id, y, m)]["spent"] += Decimal(total)
+    for column, field in ((Payment.from_user_id, "payments_sent"), (Payment.to_user_id, "payments_received")):
+        for user_id, y, m, total in db.execute(
+            select(column, Payment.shamsi_year, Payment.shamsi_month, func.sum(Payment.amount))
+            .where(Payment.shamsi_period.not_in(archived))
+            .group_by(column, Payment.shamsi_year, Payment.shamsi_month)
+        ):
+            deltas[(user_id, y, m)][field] += Decimal(total)
+    for (user_id, _, y, m), amount in ledger.compute_from_raw(db).items():
+        if shamsi_period(y, m) not in archived_periods:
+            deltas[(user_id, y, m)]["owed"] += amount
+    for key, values in stored(db, archived_only=True).items():
+        for field, amount in values.items():
+            deltas[key][field] += amount
+    return {key: values for key, values in deltas.items() if any(values.values())}
+
+def stored(db: Session, archived_only: bool = False) -> Deltas:
+    stmt = select(
+        MonthlyUserSummary.user_id,
+        MonthlyUserSummary.shamsi_year,
+        MonthlyUserSummary.shamsi_month,
+        *(getattr(MonthlyUserSummary, f) for f in FIELDS),
+    )
+    if archived_only:
+        stmt = stmt.where(MonthlyUserSummary.shamsi_period.in_(select(ArchivedPeriod.shamsi_period)))
+    rows = db.execute(stmt).all()
+    result: Deltas = {}
+    for u, y, m, *values in rows:
+        amounts = {f: Decimal(v) for f, v in zip(FIELDS, values) if v}
+        if amounts:
+            result[(u, y, m)] = amounts
+    return result
+
+def drift(db: Session) -> dict[SummaryKey, tuple[dict[str, Decimal], dict[str, Decimal]]]:
+    expected = compute_from_raw(db)
+    actual = stored(db)
+
+    def normalized(values: dict[str, Decimal] | None) -> dict[str, Decimal]:
+        return {f: (values or {}).get(f, Decimal("0.00")) for f in FIELDS}
+
+    return {
+        key: (normalized(actual.get(key)), normalized(expected.get(key)))
+        for key in expected.keys() | actual.keys()
+        if normalized(actual.get(key)) != normalized(expected.get(key))
+    }
+
+def rebuild(db: Session) -> int:
+    expected = compute_from_raw(db)
+    db.execute(delete(MonthlyUserSummary))
+    apply_deltas(db, expected)
+    return len(expected)
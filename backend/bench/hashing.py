@@ -0,0 +1,83 @@
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from passlib.hash import argon2, pbkdf2_sha256
+
+from app.core.config import settings
+
+PASSWORD = "12345678"
+
+
+def _schemes(args) -> dict:
+    return {
+        "pbkdf2_sha256": pbkdf2_sha256.using(rounds=args.pbkdf2_rounds),
+        "argon2": argon2.using(
+            time_cost=args.argon2_time_cost, memory_cost=args.argon2_memory_cost, parallelism=args.argon2_parallelism,
+        ),
+    }
+
+
+def _verify(scheme: str, hashed: str) -> bool:
+    return {"pbkdf2_sha256": pbkdf2_sha256, "argon2": argon2}[scheme].verify(PASSWORD, hashed)
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+async def _burst(executor, scheme: str, hashed: str, requests: int, concurrency: int) -> dict:
+    loop = asyncio.get_running_loop()
+    gate = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one() -> None:
+        async with gate:
+            start = time.perf_counter()
+            await loop.run_in_executor(executor, _verify, scheme, hashed)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": _percentile(latencies, 50),
+        "p95_ms": _percentile(latencies, 95),
+        "mean_ms": statistics.fmean(latencies),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure password verification throughput under concurrency.")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=settings.PASSWORD_HASH_WORKERS or 2)
+    parser.add_argument("--threads", type=int, default=40, help="size of the thread pool baseline (Starlette's default)")
+    parser.add_argument("--pbkdf2-rounds", type=int, default=settings.PBKDF2_ROUNDS)
+    parser.add_argument("--argon2-time-cost", type=int, default=settings.ARGON2_TIME_COST)
+    parser.add_argument("--argon2-memory-cost", type=int, default=settings.ARGON2_MEMORY_COST)
+    parser.add_argument("--argon2-parallelism", type=int, default=settings.ARGON2_PARALLELISM)
+    args = parser.parse_args()
+
+    print(f"{'scheme':<16}{'pool':<10}{'rps':>9}{'mean':>9}{'p50':>9}{'p95':>9}", flush=True)
+    for name, handler in _schemes(args).items():
+        hashed = handler.hash(PASSWORD)
+        for label, executor in (
+            ("threads", ThreadPoolExecutor(max_workers=args.threads)),
+            ("processes", ProcessPoolExecutor(max_workers=args.workers)),
+        ):
+            with executor:
+                executor.submit(_verify, name, hashed).result()
+                r = asyncio.run(_burst(executor, name, hashed, args.requests, args.concurrency))
+            print(f"{name:<16}{label:<10}{r['rps']:>9.1f}{r['mean_ms']:>9.1f}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}",
+                  flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,39 @@
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+import jdatetime
+
+from app.core import jalali
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare jdatetime against the Jalali lookup table.")
+    parser.add_argument("--dates", type=int, default=1_000_000)
+    parser.add_argument("--distinct-days", type=int, default=3650)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    today = date.today()
+    dates = [today - timedelta(days=random.randrange(args.distinct_days)) for _ in range(args.dates)]
+
+    start = time.perf_counter()
+    expected = [(jd.year, jd.month) for jd in (jdatetime.date.fromgregorian(date=d) for d in dates)]
+    baseline = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = [jalali.to_shamsi_year_month(d) for d in dates]
+    table = time.perf_counter() - start
+
+    if actual != expected:
+        print("MISMATCH between jdatetime and the lookup table", flush=True)
+        return 1
+    print(f"{'jdatetime':>10} {baseline:8.3f}s {args.dates / baseline:>12,.0f} dates/s", flush=True)
+    print(f"{'table':>10} {table:8.3f}s {args.dates / table:>12,.0f} dates/s", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
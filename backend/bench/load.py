@@ -0,0 +1,207 @@
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import httpx
+
+from app.core.jalali import to_shamsi_year_month
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    async def call(self, name: str, client: httpx.AsyncClient, method: str, path: str, **kwargs) -> httpx.Response | None:
+        start = time.perf_counter()
+        try:
+            res = await client.request(method, path, **kwargs)
+        except httpx.HTTPError:
+            self.errors[name] += 1
+            return None
+        self.latencies[name].append((time.perf_counter() - start) * 1000)
+        if res.status_code >= 400:
+            self.errors[name] += 1
+            return None
+        return res
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+async def _login(rec: Recorder, client: httpx.AsyncClient, username: str, password: str) -> str | None:
+    res = await rec.call("login", client, "POST", "/auth/login", json={"username": username, "password": password})
+    return res.json()["access_token"] if res else None
+
+
+def _auth(token: str) -> dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def scenario_list_expenses(rec, client, ctx) -> None:
+    uid, token = random.choice(ctx["users"])
+    params = {"page": random.randint(1, 20), "per_page": 10}
+    if random.random() < 0.5:
+        params.update(shamsi_year=ctx["shamsi_year"], shamsi_month=random.randint(1, 12))
+    await rec.call("list_expenses", client, "GET", "/expenses", params=params, headers=_auth(token))
+
+
+async def scenario_list_expenses_cursor(rec, client, ctx) -> None:
+    uid, token = random.choice(ctx["users"])
+    await rec.call("list_expenses_cursor", client, "GET", "/expenses", params={"limit": 10}, headers=_auth(token))
+
+
+async def scenario_settlement_all(rec, client, ctx) -> None:
+    params = {"shamsi_year": ctx["shamsi_year"], "shamsi_month": ctx["shamsi_month"], "scope": "all"}
+    await rec.call("settlement_all", client, "GET", "/settlements", params=params, headers=_auth(ctx["admin"]))
+
+
+async def scenario_create_approve(rec, client, ctx) -> None:
+    (payer, payer_token), (other, other_token) = random.sample(ctx["users"], 2)
+    body = {
+        "amount": random.randint(10000, 2000000),
+        "description": "bench",
+        "expense_date": (date.today() - timedelta(days=random.randint(0, 30))).isoformat(),
+        "participant_user_ids": [payer, other],
+    }
+    res = await rec.call("create_expense", client, "POST", "/expenses", json=body, headers=_auth(payer_token))
+    if res:
+        await rec.call("approve_expense", client, "POST", f"/expenses/{res.json()['id']}/approve", headers=_auth(other_token))
+
+
+async def scenario_login(rec, client, ctx) -> None:
+    await _login(rec, client, random.choice(ctx["usernames"]), ctx["password"])
+
+
+SCENARIOS = {
+    "list_expenses": (scenario_list_expenses, 40),
+    "list_expenses_cursor": (scenario_list_expenses_cursor, 15),
+    "settlement_all": (scenario_settlement_all, 15),
+    "create_approve": (scenario_create_approve, 20),
+    "login": (scenario_login, 10),
+}
+
+
+async def run(args) -> dict:
+    rec = Recorder()
+    started_at = datetime.now().isoformat(timespec="seconds")
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url.rstrip("/"), limits=limits, timeout=args.timeout) as client:
+        admin = await _login(rec, client, args.admin_username, args.admin_password)
+        if not admin:
+            raise SystemExit("Admin login failed")
+        usernames = [f"{args.prefix}_{i}" for i in range(args.users)]
+        users = []
+        for username in usernames:
+            token = await _login(rec, client, username, args.password)
+            if token:
+                me = (await client.get("/users/me", headers=_auth(token))).json()
+                users.append((me["id"], token))
+        if len(users) < 2:
+            raise SystemExit(f"Need at least two seeded users with prefix {args.prefix!r}")
+        rec.latencies.clear()
+        rec.errors.clear()
+
+        sh_y, sh_m = to_shamsi_year_month(date.today())
+        ctx = {
+            "admin": admin,
+            "users": users,
+            "usernames": usernames,
+            "password": args.password,
+            "shamsi_year": sh_y,
+            "shamsi_month": sh_m,
+        }
+        enabled = [name for name in SCENARIOS if not args.only or name in args.only]
+        funcs = [SCENARIOS[name][0] for name in enabled]
+        weights = [SCENARIOS[name][1] for name in enabled]
+
+        deadline = time.perf_counter() + args.duration
+
+        async def worker() -> None:
+            while time.perf_counter() < deadline:
+                await random.choices(funcs, weights)[0](rec, client, ctx)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    endpoints = {}
+    for name in sorted(set(rec.latencies) | set(rec.errors)):
+        values = rec.latencies.get(name, [])
+        endpoints[name] = {
+            "requests": len(values),
+            "errors": rec.errors.get(name, 0),
+            "rps": len(values) / elapsed,
+            "mean_ms": statistics.fmean(values) if values else 0.0,
+            "p50_ms": _percentile(values, 50) if values else 0.0,
+            "p95_ms": _percentile(values, 95) if values else 0.0,
+            "p99_ms": _percentile(values, 99) if values else 0.0,
+        }
+    return {
+        "started_at": started_at,
+        "label": args.label,
+        "concurrency": args.concurrency,
+        "duration_s": elapsed,
+        "total_rps": sum(e["requests"] for e in endpoints.values()) / elapsed,
+        "endpoints": endpoints,
+    }
+
+
+def print_report(result: dict, baseline: dict | None) -> None:
+    print(f"{result['label'] or 'run'}: {result['total_rps']:.1f} req/s over {result['duration_s']:.1f}s "
+          f"with {result['concurrency']} workers")
+    header = f"{'endpoint':<22}{'reqs':>8}{'errs':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}"
+    if baseline:
+        header += f"{'Δp50':>9}{'Δp95':>9}"
+    print(header)
+    for name, e in result["endpoints"].items():
+        line = (f"{name:<22}{e['requests']:>8}{e['errors']:>6}{e['rps']:>9.1f}"
+                f"{e['p50_ms']:>9.1f}{e['p95_ms']:>9.1f}{e['p99_ms']:>9.1f}")
+        base = (baseline or {}).get("endpoints", {}).get(name)
+        if base:
+            line += f"{e['p50_ms'] - base['p50_ms']:>+9.1f}{e['p95_ms'] - base['p95_ms']:>+9.1f}"
+        print(line)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Concurrent load generator for the HamHesab API.")
+    parser.add_argument("--base-url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--admin-username", required=True)
+    parser.add_argument("--admin-password", required=True)
+    parser.add_argument("--prefix", required=True, help="username prefix used by bench.seed")
+    parser.add_argument("--password", default="12345678", help="password of the seeded users")
+    parser.add_argument("--users", type=int, default=20, help="how many seeded users to log in as")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--only", nargs="*", choices=sorted(SCENARIOS))
+    parser.add_argument("--label", default="")
+    parser.add_argument("--compare", type=Path, help="previous result JSON to diff against")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print_report(result, baseline)
+    if not args.no_save:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = RESULTS_DIR / f"{stamp}{'-' + args.label if args.label else ''}.json"
+        path.write_text(json.dumps(result, indent=2))
+        print(f"Saved {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,115 @@
+import argparse
+import random
+import string
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import func, insert, select
+
+from app.core.database import SessionLocal
+from app.core.jalali import shamsi_period, to_shamsi_year_month
+from app.core.security import hash_password
+from app.models import Expense, ExpenseParticipant, Payment, User
+from app.services import ledger, split, summary
+
+BENCH_PASSWORD = "12345678"
+
+
+def _rand_str(n: int) -> str:
+    return "".join(random.choices(string.ascii_lowercase + string.digits, k=n))
+
+
+def _next_id(db, column) -> int:
+    return (db.scalar(select(func.max(column))) or 0) + 1
+
+
+def seed(db, args) -> dict[str, int]:
+    hashed = hash_password(BENCH_PASSWORD)
+    first_user = _next_id(db, User.id)
+    user_ids = list(range(first_user, first_user + args.users))
+    db.execute(
+        insert(User),
+        [
+            {"id": uid, "first_name": f"User{i + 1}", "last_name": "Bench", "username": f"{args.prefix}_{i}",
+             "hashed_password": hashed, "is_admin": False, "is_approved": True, "is_active": True}
+            for i, uid in enumerate(user_ids)
+        ],
+    )
+
+    today = date.today()
+    next_expense = _next_id(db, Expense.id)
+    next_payment = _next_id(db, Payment.id)
+    expenses = payments = 0
+    for payer in user_ids:
+        exp_rows, part_rows, pay_rows = [], [], []
+        for _ in range(args.expenses_per_user):
+            day = today - timedelta(days=random.randint(0, args.days))
+            sh_y, sh_m = to_shamsi_year_month(day)
+            others = random.sample([u for u in user_ids if u != payer], k=min(args.participants - 1, len(user_ids) - 1))
+            participants = [payer, *others]
+            amount = Decimal(random.randint(10000, 2000000))
+            shares = split.split_amount(amount, [Decimal(1)] * len(participants))
+            approved = random.random() < args.approved_ratio
+            exp_rows.append({
+                "id": next_expense, "payer_id": payer, "amount": amount, "description": f"Expense {_rand_str(6)}",
+                "expense_date": day, "shamsi_year": sh_y, "shamsi_month": sh_m,
+                "status": "approved" if approved else "pending",
+            })
+            part_rows.extend(
+                {
+                    "expense_id": next_expense, "user_id": uid, "shamsi_period": shamsi_period(sh_y, sh_m),
+                    "share_amount": share, "approved": approved or uid == payer,
+                }
+                for uid, share in zip(participants, shares)
+            )
+            next_expense += 1
+        for _ in range(args.payments_per_user):
+            day = today - timedelta(days=random.randint(0, args.days))
+            sh_y, sh_m = to_shamsi_year_month(day)
+            pay_rows.append({
+                "id": next_payment, "from_user_id": payer, "to_user_id": random.choice([u for u in user_ids if u != payer]),
+                "amount": Decimal(random.randint(10000, 2000000)), "description": f"Payment {_rand_str(6)}",
+                "payment_date": day, "shamsi_year": sh_y, "shamsi_month": sh_m,
+            })
+            next_payment += 1
+        if exp_rows:
+            db.execute(insert(Expense), exp_rows)
+            db.execute(insert(ExpenseParticipant), part_rows)
+        if pay_rows:
+            db.execute(insert(Payment), pay_rows)
+        expenses += len(exp_rows)
+        payments += len(pay_rows)
+
+    ledger.rebuild(db)
+    summary.rebuild(db)
+    return {"users": len(user_ids), "expenses": expenses, "payments": payments}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Seed a benchmark dataset directly through bulk SQL.")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--expenses-per-user", type=int, default=100)
+    parser.add_argument("--payments-per-user", type=int, default=100)
+    parser.add_argument("--participants", type=int, default=5)
+    parser.add_argument("--approved-ratio", type=float, default=0.8)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--prefix", default=f"bench_{_rand_str(4)}")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        counts = seed(db, args)
+        db.commit()
+    print(
+        f"Seeded {counts['users']} users ({args.prefix}_0..{args.users - 1}, password {BENCH_PASSWORD!r}), "
+        f"{counts['expenses']} expenses, {counts['payments']} payments in {time.perf_counter() - started:.1f}s",
+        flush=True,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
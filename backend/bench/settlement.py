@@ -0,0 +1,59 @@
+import argparse
+import random
+import statistics
+import time
+
+from app.services import settlement
+
+
+def random_balances(n: int) -> dict[int, int]:
+    cents = [random.randint(-500_000, 500_000) for _ in range(n - 1)]
+    cents.append(-sum(cents))
+    return dict(enumerate(cents, start=1))
+
+
+def clustered_balances(n: int) -> dict[int, int]:
+    cents: list[int] = []
+    while len(cents) < n:
+        size = min(random.randint(2, 4), n - len(cents))
+        group = [random.randint(-500_000, 500_000) for _ in range(size - 1)]
+        group.append(-sum(group))
+        cents.extend(group)
+    random.shuffle(cents)
+    return dict(enumerate(cents, start=1))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare settlement strategies across group sizes.")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[5, 10, 15, 20, 50, 100, 200, 500])
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--time-budget-ms", type=float, default=200)
+    parser.add_argument("--distribution", choices=["random", "clustered"], default="clustered",
+                        help="clustered balances hide zero-sum subgroups that an exact solver can exploit")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    make = clustered_balances if args.distribution == "clustered" else random_balances
+
+    names = list(settlement.STRATEGIES)
+    header = f"{'users':>6}" + "".join(f"{name + ' n':>14}{name + ' ms':>14}" for name in names)
+    print(header, flush=True)
+    for size in args.sizes:
+        counts: dict[str, list[int]] = {name: [] for name in names}
+        timings: dict[str, list[float]] = {name: [] for name in names}
+        for _ in range(args.trials):
+            balances = make(size)
+            for name in names:
+                start = time.perf_counter()
+                transfers = settlement.settle(balances, name, args.time_budget_ms)
+                timings[name].append((time.perf_counter() - start) * 1000)
+                counts[name].append(len(transfers))
+        line = f"{size:>6}"
+        for name in names:
+            line += f"{statistics.fmean(counts[name]):>14.1f}{statistics.fmean(timings[name]):>14.2f}"
+        print(line, flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,70 @@
+import argparse
+import re
+from datetime import date
+
+from app.core.database import SessionLocal
+from app.core.jalali import shamsi_period, to_shamsi_year_month
+from app.services import archive
+
+
+def _period(value: str) -> int:
+    match = re.match(r"^(\d{4})-(\d{1,2})$", value.strip())
+    if not match or not 1 <= int(match.group(2)) <= 12:
+        raise argparse.ArgumentTypeError("expected a Shamsi month like 1403-07")
+    return shamsi_period(int(match.group(1)), int(match.group(2)))
+
+
+def _label(period: int) -> str:
+    return f"{period // 100}-{period % 100:02d}"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Delete raw expenses/payments of fully approved Shamsi months before --before, keeping their "
+        "balance_ledger and monthly_user_summary rows, and maintain the yearly partitions."
+    )
+    parser.add_argument("--before", type=_period, required=True, help="first month to keep, e.g. 1403-01")
+    parser.add_argument("--dry-run", action="store_true", help="only list what would be archived")
+    parser.add_argument("--skip-partitions", action="store_true", help="do not add or drop MySQL partitions")
+    args = parser.parse_args()
+
+    current_year, current_month = to_shamsi_year_month(date.today())
+    if args.before > shamsi_period(current_year, current_month):
+        print("--before cannot be in the future", flush=True)
+        return 2
+
+    with SessionLocal() as db:
+        approved, pending = archive.candidates(db, args.before)
+        for period in pending:
+            print(f"{_label(period)} has pending expenses, skipped", flush=True)
+        drifted = archive.drifted_periods(db) & set(approved)
+        if drifted:
+            months = ", ".join(_label(p) for p in sorted(drifted))
+            print(f"Ledger/summary drift in {months}; run scripts.rebuild_ledger and scripts.rebuild_summary first", flush=True)
+            return 1
+
+        for period in approved:
+            if args.dry_run:
+                print(f"{_label(period)} would be archived", flush=True)
+                continue
+            expenses, payments = archive.archive_period(db, period)
+            db.commit()
+            print(f"{_label(period)} archived: {expenses} expenses, {payments} payments", flush=True)
+        if approved and not args.dry_run:
+            print(
+                "API workers keep cached expense/payment lists for up to RESPONSE_CACHE_TTL_SECONDS; "
+                "restart them to drop archived rows straight away",
+                flush=True,
+            )
+
+        if args.dry_run or args.skip_partitions:
+            return 0
+        for name in archive.drop_empty_partitions(db, args.before):
+            print(f"dropped partition {name}", flush=True)
+        for name in archive.ensure_partitions(db, current_year + 1):
+            print(f"added partition {name}", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,102 @@
+import argparse
+import os
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, exists, func, insert, or_, select
+
+from app.core.jalali import shamsi_period, to_shamsi_year_month
+from app.models import Base, Expense, ExpenseParticipant, User
+
+
+def seed(conn, users: int, expenses: int, participants: int, chunk: int = 10_000) -> None:
+    conn.execute(
+        insert(User),
+        [
+            {"id": i, "first_name": "Bench", "last_name": str(i), "username": f"bench_{i}", "hashed_password": "-",
+             "is_admin": i == 1, "is_approved": True, "is_active": True}
+            for i in range(1, users + 1)
+        ],
+    )
+    start = date(2024, 3, 20)
+    for base in range(1, expenses + 1, chunk):
+        exp_rows, part_rows = [], []
+        for eid in range(base, min(base + chunk, expenses + 1)):
+            day = start + timedelta(days=random.randint(0, 730))
+            payer = random.randint(1, users)
+            sh_y, sh_m = to_shamsi_year_month(day)
+            exp_rows.append({
+                "id": eid, "payer_id": payer, "amount": 1000, "description": f"bench {eid}",
+                "expense_date": day, "shamsi_year": sh_y, "shamsi_month": sh_m,
+                "status": "approved",
+            })
+            for uid in random.sample(range(1, users + 1), k=min(participants, users)):
+                part_rows.append({
+                    "expense_id": eid, "user_id": uid, "shamsi_period": shamsi_period(sh_y, sh_m),
+                    "share_amount": 100, "approved": True,
+                })
+        conn.execute(insert(Expense), exp_rows)
+        conn.execute(insert(ExpenseParticipant), part_rows)
+        print(f"seeded {eid} expenses", flush=True)
+
+
+def old_queries(user_id: int):
+    join = (ExpenseParticipant, ExpenseParticipant.expense_id == Expense.id)
+    scope = or_(Expense.payer_id == user_id, ExpenseParticipant.user_id == user_id)
+    page = select(Expense.id).join(*join, isouter=True).where(scope).distinct().order_by(Expense.id.desc()).limit(10)
+    count = select(func.count(func.distinct(Expense.id))).select_from(Expense).join(*join, isouter=True).where(scope)
+    return page, count
+
+
+def new_queries(user_id: int):
+    scope = or_(
+        Expense.payer_id == user_id,
+        exists().where(ExpenseParticipant.expense_id == Expense.id, ExpenseParticipant.user_id == user_id),
+    )
+    page = select(Expense.id).where(scope).order_by(Expense.id.desc()).limit(10)
+    count = select(func.count()).select_from(Expense).where(scope)
+    return page, count
+
+
+def timed(conn, stmt, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        conn.execute(stmt).all()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare expense visibility query plans on a seeded database.")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--expenses", type=int, default=1_000_000)
+    parser.add_argument("--participants", type=int, default=3)
+    parser.add_argument("--sample-users", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    if not args.database_url:
+        print("Pass --database-url or set BENCH_DATABASE_URL (the database will be filled with data)", flush=True)
+        return 1
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        if not conn.scalar(select(func.count()).select_from(Expense)):
+            seed(conn, args.users, args.expenses, args.participants)
+
+    with engine.connect() as conn:
+        user_ids = random.sample(range(1, args.users + 1), k=min(args.sample_users, args.users))
+        print(f"{'query':<8}{'old ms':>12}{'new ms':>12}", flush=True)
+        for label, idx in (("page", 0), ("count", 1)):
+            old = statistics.median(timed(conn, old_queries(uid)[idx], args.repeat) for uid in user_ids)
+            new = statistics.median(timed(conn, new_queries(uid)[idx], args.repeat) for uid in user_ids)
+            print(f"{label:<8}{old:>12.2f}{new:>12.2f}", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
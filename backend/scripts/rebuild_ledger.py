@@ -0,0 +1,31 @@
+import argparse
+
+from app.core.database import SessionLocal
+from app.services import ledger
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Recompute balance_ledger from expenses and payments.")
+    parser.add_argument("--verify", action="store_true", help="only report drift, do not write")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        diffs = ledger.drift(db)
+        for (user_id, counterparty_id, year, month), (stored, expected) in sorted(diffs.items()):
+            print(
+                f"{year}-{month:02d} user={user_id} counterparty={counterparty_id} stored={stored} expected={expected}",
+                flush=True,
+            )
+        print(f"{len(diffs)} drifted ledger rows", flush=True)
+
+        if args.verify:
+            return 1 if diffs else 0
+
+        rows = ledger.rebuild(db)
+        db.commit()
+        print(f"Ledger rebuilt with {rows} rows", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,29 @@
+import argparse
+
+from app.core.database import SessionLocal
+from app.services import summary
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Recompute monthly_user_summary from expenses and payments.")
+    parser.add_argument("--verify", action="store_true", help="only report drift, do not write")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        diffs = summary.drift(db)
+        for (user_id, year, month), (stored, expected) in sorted(diffs.items()):
+            changed = ", ".join(f"{f}: {stored[f]} != {expected[f]}" for f in summary.FIELDS if stored[f] != expected[f])
+            print(f"{year}-{month:02d} user={user_id} {changed}", flush=True)
+        print(f"{len(diffs)} drifted summary rows", flush=True)
+
+        if args.verify:
+            return 1 if diffs else 0
+
+        rows = summary.rebuild(db)
+        db.commit()
+        print(f"Summary rebuilt with {rows} rows", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
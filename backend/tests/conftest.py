@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+_db_dir = tempfile.mkdtemp(prefix="hamhesab-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/test.sqlite")
+# A second engine on the same file stands in for a replica with no lag, so read
+# routing can be observed per engine (see test_replica_routing.py).
+os.environ.setdefault("DATABASE_REPLICA_URLS", os.environ["DATABASE_URL"])
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+os.environ.setdefault("ARGON2_TIME_COST", "1")
+os.environ.setdefault("ARGON2_MEMORY_COST", "1024")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import BigInteger
+from sqlalchemy.ext.compiler import compiles
+
+from app.api.conditional import bump_data_version
+from app.core import profiling
+from app.core.database import engine, replica_engines
+from app.main import app
+from app.models import Base
+
+# SQLite only autoincrements INTEGER PRIMARY KEY columns.
+@compiles(BigInteger, "sqlite")
+def _sqlite_bigint(type_, compiler, **kw):
+    return "INTEGER"
+
+PASSWORD = "secret1"
+
+# Wraps the whole ASGI call, so statements run while a streaming body is sent
+# are counted as well. capture() has to be entered inside the app's context:
+# TestClient runs the app on another thread.
+class _CapturingApp:
+    def __init__(self, app) -> None:
+        self.app = app
+        self.last: profiling.RequestStats | None = None
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with profiling.capture() as stats:
+            self.last = stats
+            await self.app(scope, receive, send)
+
+class BudgetClient(TestClient):
+    @contextmanager
+    def query_budget(self, budget: int, label: str = "request"):
+        # Cached responses would hide the queries being budgeted.
+        bump_data_version()
+        self.app.last = None
+        yield
+        assert self.app.last is not None, "no request was made"
+        profiling.check_budget(label, self.app.last, budget)
+
+@pytest.fixture(scope="session")
+def client():
+    Base.metadata.create_all(engine)
+    for sync_engine in [engine, *replica_engines]:
+        profiling.install(sync_engine)
+    with BudgetClient(_CapturingApp(app)) as client:
+        yield client
+
+def _register(client: TestClient, username: str) -> None:
+    r = client.post(
+        "/api/v1/users",
+        json={"first_name": username, "last_name": "test", "username": username, "password": PASSWORD},
+    )
+    assert r.status_code == 200, r.text
+
+def _headers(client: TestClient, username: str) -> dict[str, str]:
+    r = client.post("/api/v1/auth/login", json={"username": username, "password": PASSWORD})
+    assert r.status_code == 200, r.text
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+# An admin (user id 1) and four approved members, tokens issued after approval.
+@pytest.fixture(scope="session")
+def users(client):
+    names = [f"user{i}" for i in range(5)]
+    for name in names:
+        _register(client, name)
+    admin = _headers(client, names[0])
+    for user_id in range(2, len(names) + 1):
+        r = client.patch(f"/api/v1/users/{user_id}/approve", json={"is_approved": True}, headers=admin)
+        assert r.status_code == 200, r.text
+    return [_headers(client, name) for name in names]
+
+# `payer`, `sender`, `to` and `participants` index into `users`, whose ids are index + 1.
+def add_expense(client, users, payer: int, amount, participants: list[int], expense_date: str, approve: bool = True, **extra) -> int:
+    r = client.post(
+        "/api/v1/expenses",
+        json={
+            "amount": str(amount),
+            "description": extra.pop("description", "test expense"),
+            "expense_date": expense_date,
+            "participant_user_ids": [i + 1 for i in participants],
+            **extra,
+        },
+        headers=users[payer],
+    )
+    assert r.status_code == 200, r.text
+    expense_id = r.json()["id"]
+    for i in participants if approve else []:
+        r = client.post(f"/api/v1/expenses/{expense_id}/approve", headers=users[i])
+        assert r.status_code == 200, r.text
+    return expense_id
+
+def add_payment(client, users, sender: int, to: int, amount, payment_date: str) -> int:
+    r = client.post(
+        "/api/v1/payments",
+        json={"to_user_id": to + 1, "amount": str(amount), "payment_date": payment_date},
+        headers=users[sender],
+    )
+    assert r.status_code == 200, r.text
+    return r.json()["id"]
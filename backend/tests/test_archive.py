@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from app.api.conditional import bump_data_version
+from app.core.database import SessionLocal
+from app.core.jalali import shamsi_period
+from app.services import archive, ledger, summary
+from conftest import PASSWORD, add_expense, add_payment
+
+def _snapshot(client, users) -> list:
+    requests = [
+        ("/api/v1/settlements", {"to": "1399-12", "scope": "all"}, users[0]),
+        ("/api/v1/settlements", {"from": "1399-03", "to": "1399-03"}, users[1]),
+        ("/api/v1/reports/monthly", {"from": "1399-01", "to": "1399-12", "scope": "all"}, users[0]),
+        ("/api/v1/reports/monthly", {"from": "1399-01", "to": "1399-12"}, users[2]),
+    ]
+    responses = []
+    for path, params, headers in requests:
+        r = client.get(path, params=params, headers=headers)
+        assert r.status_code == 200, r.text
+        responses.append(r.json())
+    return responses
+
+def test_archive_keeps_settlements_and_reports(client, users):
+    # 1399-03 is fully approved but not paid off; 1399-02 still has a pending expense.
+    add_expense(client, users, 0, "90.10", [0, 1, 2], "2020-06-15")
+    add_expense(client, users, 1, "33.33", [1, 3], "2020-06-20")
+    add_payment(client, users, 2, 0, "10.05", "2020-06-18")
+    pending = add_expense(client, users, 0, "12.00", [0, 4], "2020-05-10", approve=False)
+    before = _snapshot(client, users)
+    assert before[1]["my_balances"]
+
+    with SessionLocal() as db:
+        approved, skipped = archive.candidates(db, shamsi_period(1399, 4))
+        assert (approved, skipped) == ([shamsi_period(1399, 3)], [shamsi_period(1399, 2)])
+        assert not archive.drifted_periods(db)
+        assert archive.archive_period(db, shamsi_period(1399, 3)) == (2, 1)
+        db.commit()
+        assert not ledger.drift(db)
+        assert not summary.drift(db)
+        # Partitions only exist on MySQL.
+        assert archive.drop_empty_partitions(db, shamsi_period(1399, 4)) == []
+        assert archive.ensure_partitions(db, 1400) == []
+
+    bump_data_version()
+    assert _snapshot(client, users) == before
+    r = client.get("/api/v1/expenses", params={"from": "1399-01", "to": "1399-12", "scope": "all"}, headers=users[0])
+    assert [e["id"] for e in r.json()] == [pending]
+    r = client.get("/api/v1/payments", params={"from": "1399-01", "to": "1399-12", "scope": "all"}, headers=users[0])
+    assert r.json() == []
+
+def test_delete_user_with_archived_balances(client, users):
+    r = client.post(
+        "/api/v1/users",
+        json={"first_name": "gone", "last_name": "test", "username": "archived_member", "password": PASSWORD},
+    )
+    user_id = r.json()["id"]
+    client.patch(f"/api/v1/users/{user_id}/approve", json={"is_approved": True}, headers=users[0])
+    r = client.post("/api/v1/auth/login", json={"username": "archived_member", "password": PASSWORD})
+    member = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    r = client.post(
+        "/api/v1/expenses",
+        json={"amount": "40", "description": "old trip", "expense_date": "2019-07-10", "participant_user_ids": [1, user_id]},
+        headers=users[0],
+    )
+    assert client.post(f"/api/v1/expenses/{r.json()['id']}/approve", headers=member).status_code == 200
+    with SessionLocal() as db:
+        assert archive.candidates(db, shamsi_period(1398, 5))[0] == [shamsi_period(1398, 4)]
+        archive.archive_period(db, shamsi_period(1398, 4))
+        db.commit()
+
+    client.patch(f"/api/v1/users/{user_id}/approve", json={"is_approved": False}, headers=users[0])
+    r = client.delete(f"/api/v1/users/{user_id}", headers=users[0])
+    assert r.status_code == 400, r.text
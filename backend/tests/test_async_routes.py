@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.api.conditional import bump_data_version
+from app.api.deps import get_async_db
+from app.api.v1.async_endpoints import expenses, payments, settlements, users as users_endpoints
+from app.core.config import settings
+from app.core.database import RoutingSession
+
+# The async handlers are only mounted when ASYNC_DATABASE_URL is set at import
+# time, so they get their own app here, on an aiosqlite engine over the test DB.
+@pytest.fixture(scope="module")
+def async_client(client):
+    engine = create_async_engine(settings.DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1), poolclass=NullPool)
+    sessions = async_sessionmaker(bind=engine, sync_session_class=RoutingSession, autoflush=False)
+
+    async def get_test_async_db():
+        async with sessions() as db:
+            yield db
+
+    app = FastAPI()
+    for module, prefix in (
+        (users_endpoints, "/users"), (expenses, "/expenses"), (payments, "/payments"), (settlements, "/settlements"),
+    ):
+        app.include_router(module.router, prefix=f"{settings.API_V1_STR}{prefix}")
+    app.dependency_overrides[get_async_db] = get_test_async_db
+    with TestClient(app) as async_client:
+        yield async_client
+
+def test_async_routes_end_to_end(client, async_client, users):
+    r = async_client.post(
+        "/api/v1/expenses",
+        json={"amount": "30.00", "description": "async dinner", "expense_date": "2016-06-15", "participant_user_ids": [1, 2, 3]},
+        headers=users[0],
+    )
+    assert r.status_code == 200, r.text
+    expense_id = r.json()["id"]
+    assert r.json()["status"] == "pending"
+    for headers in users[1:3]:
+        r = async_client.post(f"/api/v1/expenses/{expense_id}/approve", headers=headers)
+        assert r.status_code == 200, r.text
+    assert r.json()["expense_status"] == "approved"
+    r = async_client.post(
+        "/api/v1/payments", json={"to_user_id": 1, "amount": "5.00", "payment_date": "2016-06-20"}, headers=users[1]
+    )
+    assert r.status_code == 200, r.text
+
+    params = {"from": "1395-01", "to": "1395-12"}
+    for path, headers in (
+        ("/api/v1/expenses", users[1]),
+        ("/api/v1/payments", users[1]),
+        ("/api/v1/settlements", users[1]),
+        ("/api/v1/users/me", users[2]),
+    ):
+        bump_data_version()
+        async_r = async_client.get(path, params=params, headers=headers)
+        assert async_r.status_code == 200 and async_r.json(), async_r.text
+        assert async_r.json() == client.get(path, params=params, headers=headers).json(), path
+
+    r = async_client.get("/api/v1/settlements", params=params, headers=users[1])
+    assert {b["user_id"]: b["balance"] for b in r.json()["my_balances"]} == {1: "-5.00"}
+    r = async_client.get("/api/v1/settlements", params=params, headers={**users[1], "If-None-Match": r.headers["etag"]})
+    assert r.status_code == 304
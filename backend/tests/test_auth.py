@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import pytest
+from fastapi import HTTPException
+from passlib.hash import pbkdf2_sha256
+
+from app.api.deps import get_current_user
+from app.core import security
+from app.core.database import SessionLocal
+from app.models.user import User
+from conftest import PASSWORD
+
+def _signup(client, username: str) -> int:
+    r = client.post(
+        "/api/v1/users",
+        json={"first_name": username, "last_name": "test", "username": username, "password": PASSWORD},
+    )
+    assert r.status_code == 200, r.text
+    return r.json()["id"]
+
+def _login(client, username: str) -> dict:
+    r = client.post("/api/v1/auth/login", json={"username": username, "password": PASSWORD})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+def _bearer(tokens: dict) -> dict[str, str]:
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+def _refresh(client, tokens: dict):
+    return client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+
+def test_refresh_issues_working_tokens(client, users):
+    tokens = _login(client, "user1")
+    r = _refresh(client, tokens)
+    assert r.status_code == 200, r.text
+    assert client.get("/api/v1/users/me", headers=_bearer(r.json())).json()["username"] == "user1"
+
+def test_refresh_rejects_access_tokens(client, users):
+    tokens = _login(client, "user1")
+    r = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["access_token"]})
+    assert r.status_code == 401
+
+def test_approval_keeps_refresh_token(client, users):
+    user_id = _signup(client, "auth_pending")
+    tokens = _login(client, "auth_pending")
+    assert client.get("/api/v1/expenses", headers=_bearer(tokens)).status_code == 403
+
+    r = client.patch(f"/api/v1/users/{user_id}/approve", json={"is_approved": True}, headers=users[0])
+    assert r.status_code == 200, r.text
+    # The old access token carries apr=false and is rejected...
+    assert client.get("/api/v1/users/me", headers=_bearer(tokens)).status_code == 401
+    # ...but the refresh token still works and picks up the new claims.
+    r = _refresh(client, tokens)
+    assert r.status_code == 200, r.text
+    assert client.get("/api/v1/expenses", headers=_bearer(r.json())).status_code == 200
+
+def test_deactivation_revokes_refresh_tokens_across_restarts(client, users):
+    user_id = _signup(client, "auth_member")
+    client.patch(f"/api/v1/users/{user_id}/approve", json={"is_approved": True}, headers=users[0])
+    tokens = _login(client, "auth_member")
+
+    r = client.patch(f"/api/v1/users/{user_id}/active", json={"is_active": False}, headers=users[0])
+    assert r.status_code == 200, r.text
+    assert client.get("/api/v1/users/me", headers=_bearer(tokens)).status_code == 401
+    assert _refresh(client, tokens).status_code == 401
+
+    # A restart forgets the in-memory access revocations, not the refresh version.
+    security._claims_revoked_at.clear()
+    client.patch(f"/api/v1/users/{user_id}/active", json={"is_active": True}, headers=users[0])
+    assert _refresh(client, tokens).status_code == 401
+    assert _refresh(client, _login(client, "auth_member")).status_code == 200
+
+def test_claims_authorize_without_db_lookup():
+    token = security.create_access_token("987654", claims={"adm": False, "apr": True})
+    with SessionLocal() as db:
+        user = get_current_user(db=db, token=token)
+    assert (user.id, user.is_admin, user.is_approved, user.is_active) == (987654, False, True, True)
+
+def test_tokens_without_claims_are_checked_against_db():
+    token = security.create_access_token("987654")
+    with SessionLocal() as db, pytest.raises(HTTPException) as exc:
+        get_current_user(db=db, token=token)
+    assert exc.value.status_code == 401
+
+def test_signup_and_login_through_the_hashing_pool(client, monkeypatch):
+    monkeypatch.setattr(security.settings, "PASSWORD_HASH_WORKERS", 1)
+    try:
+        user_id = _signup(client, "pooled")
+        assert security._executor._mp_context.get_start_method() == "spawn"
+        with SessionLocal() as db:
+            user = db.get(User, user_id)
+            assert user.hashed_password.startswith("$argon2")
+            user.hashed_password = pbkdf2_sha256.hash(PASSWORD)
+            db.commit()
+        assert _login(client, "pooled")["access_token"]
+        with SessionLocal() as db:
+            assert db.get(User, user_id).hashed_password.startswith("$argon2")
+    finally:
+        security.shutdown_executor()
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import pytest
+
+from app.api.conditional import bump_data_version
+from app.core import database
+from conftest import add_payment
+
+SETTLEMENT = ("/api/v1/settlements", {"to": "1404-12"})
+
+# Replica-built responses are never cached (see test_replica_routing.py).
+@pytest.fixture(autouse=True)
+def _primary_only(monkeypatch):
+    monkeypatch.setattr(database, "replica_engines", [])
+    bump_data_version()
+
+def _get(client, headers, path=SETTLEMENT[0], params=SETTLEMENT[1], etag=None):
+    if etag is not None:
+        headers = {**headers, "If-None-Match": etag}
+    return client.get(path, params=params, headers=headers)
+
+@pytest.mark.parametrize("path, params", [SETTLEMENT, ("/api/v1/expenses", {}), ("/api/v1/payments", {"limit": 5})])
+def test_etag_and_not_modified(client, users, path, params):
+    r = _get(client, users[1], path, params)
+    assert r.status_code == 200, r.text
+    etag = r.headers["etag"]
+    assert etag.startswith('"') and etag.endswith('"')
+    assert r.headers["cache-control"] == "private, no-cache"
+
+    for header in (etag, f"W/{etag}", f'"nope", {etag}', "*"):
+        r304 = _get(client, users[1], path, params, etag=header)
+        assert r304.status_code == 304, header
+        assert r304.content == b""
+        assert r304.headers["etag"] == etag
+
+    r2 = _get(client, users[1], path, params, etag='"nope"')
+    assert r2.status_code == 200
+    assert r2.content == r.content
+
+def test_cached_response_runs_no_sql(client, users):
+    _get(client, users[1])
+    _get(client, users[1])
+    assert client.app.last.count == 0
+
+def test_data_version_bump_rebuilds_the_response(client, users):
+    etag = _get(client, users[1]).headers["etag"]
+
+    # Nothing changed: the rebuilt response hashes to the same ETag.
+    bump_data_version()
+    r = _get(client, users[1], etag=etag)
+    assert client.app.last.count > 0
+    assert r.status_code == 304
+
+    # A write bumps the version itself, and the new data gets a new ETag.
+    add_payment(client, users, 1, 2, "4.20", "2025-05-06")
+    r = _get(client, users[1], etag=etag)
+    assert r.status_code == 200, r.text
+    assert r.headers["etag"] != etag
+    assert _get(client, users[1], etag=r.headers["etag"]).status_code == 304
+
+def test_cache_is_per_caller(client, users):
+    r1 = _get(client, users[1])
+    r2 = _get(client, users[2], etag=r1.headers["etag"])
+    assert r2.status_code == 200
+    assert r2.headers["etag"] != r1.headers["etag"]
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+
+import pytest
+
+from app.api.v1.endpoints import expenses as expense_endpoints, payments as payment_endpoints
+from conftest import add_expense, add_payment
+
+# Shamsi 1393, which no other test touches.
+RANGE = {"from": "1393-01", "to": "1393-12"}
+
+@pytest.fixture(scope="module")
+def export_data(client, users):
+    ids = [
+        add_expense(client, users, 3, "12.50", [3, 4], "2014-04-10", description='hotel, "sea view"'),
+        add_expense(client, users, 4, "9.99", [4, 3, 0], "2014-06-10", description="شام"),
+        add_expense(client, users, 3, "3.00", [3, 4], "2014-06-12", approve=False, description="coffee"),
+    ]
+    payments = [
+        add_payment(client, users, 3, 4, "5.00", "2014-04-15"),
+        add_payment(client, users, 4, 3, "1.25", "2014-06-15"),
+    ]
+    return {"expenses": ids[::-1], "payments": payments[::-1]}
+
+def _export(client, headers, kind: str, fmt: str, **params):
+    r = client.get(f"/api/v1/{kind}/export", params={"format": fmt, **RANGE, **params}, headers=headers)
+    assert r.status_code == 200, r.text
+    assert r.headers["content-disposition"] == f'attachment; filename="{kind}.{fmt}"'
+    if fmt == "csv":
+        assert r.headers["content-type"].startswith("text/csv")
+        header, *rows = csv.reader(io.StringIO(r.text))
+        return header, [dict(zip(header, row)) for row in rows]
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    return None, [json.loads(line) for line in r.text.splitlines()]
+
+def test_expense_csv(client, users, export_data):
+    header, rows = _export(client, users[3], "expenses", "csv")
+    assert header == expense_endpoints._EXPORT_COLUMNS
+    assert [int(row["id"]) for row in rows] == export_data["expenses"]
+    hotel = rows[-1]
+    assert (hotel["description"], hotel["amount"], hotel["shamsi_month"]) == ('hotel, "sea view"', "12.50", "1")
+    assert [(p["user_id"], p["share_amount"]) for p in json.loads(hotel["participants"])] == [(4, "6.25"), (5, "6.25")]
+    assert rows[1]["description"] == "شام"
+    assert len(json.loads(rows[1]["participants"])) == 3
+
+def test_expense_ndjson(client, users, export_data):
+    _, rows = _export(client, users[3], "expenses", "ndjson")
+    assert [row["id"] for row in rows] == export_data["expenses"]
+    assert set(rows[0]) == set(expense_endpoints._EXPORT_COLUMNS)
+    assert rows[0]["status"] == "pending"
+    assert rows[0]["participants"] == [
+        {"user_id": 4, "share_amount": "1.50", "approved": True},
+        {"user_id": 5, "share_amount": "1.50", "approved": False},
+    ]
+
+@pytest.mark.parametrize("fmt", ["csv", "ndjson"])
+def test_expense_export_filters(client, users, export_data, fmt):
+    newest, middle, oldest = export_data["expenses"]
+    _, rows = _export(client, users[3], "expenses", fmt, **{"from": "1393-03", "to": "1393-03"})
+    assert [int(row["id"]) for row in rows] == [newest, middle]
+    _, rows = _export(client, users[3], "expenses", fmt, q="hotel")
+    assert [int(row["id"]) for row in rows] == [oldest]
+    # user 1 only takes part in the 9.99 expense; user 3 in none.
+    _, rows = _export(client, users[0], "expenses", fmt)
+    assert [int(row["id"]) for row in rows] == [middle]
+    _, rows = _export(client, users[2], "expenses", fmt)
+    assert rows == []
+    _, rows = _export(client, users[0], "expenses", fmt, scope="all")
+    assert [int(row["id"]) for row in rows] == export_data["expenses"]
+
+def test_payment_csv(client, users, export_data):
+    header, rows = _export(client, users[3], "payments", "csv")
+    assert header == payment_endpoints._EXPORT_COLUMNS
+    assert [int(row["id"]) for row in rows] == export_data["payments"]
+    assert (rows[0]["from_user_id"], rows[0]["to_user_id"], rows[0]["amount"]) == ("5", "4", "1.25")
+
+@pytest.mark.parametrize("fmt", ["csv", "ndjson"])
+def test_payment_export_filters(client, users, export_data, fmt):
+    newest, oldest = export_data["payments"]
+    _, rows = _export(client, users[4], "payments", fmt, shamsi_year=1393, shamsi_month=1)
+    assert [int(row["id"]) for row in rows] == [oldest]
+    _, rows = _export(client, users[1], "payments", fmt)
+    assert rows == []
+    _, rows = _export(client, users[0], "payments", fmt, scope="all")
+    assert [int(row["id"]) for row in rows] == [newest, oldest]
+
+def test_empty_csv_still_has_a_header(client, users):
+    r = client.get("/api/v1/payments/export", params={"from": "1390-01", "to": "1390-12"}, headers=users[1])
+    assert r.text.splitlines() == [",".join(payment_endpoints._EXPORT_COLUMNS)]
+
+def test_unknown_format(client, users):
+    assert client.get("/api/v1/expenses/export", params={"format": "xml"}, headers=users[1]).status_code == 422
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+import jdatetime
+import pytest
+
+from app.core import jalali
+
+def _expected(d: date) -> tuple[int, int]:
+    jd = jdatetime.date.fromgregorian(date=d)
+    return jd.year, jd.month
+
+def test_table_matches_jdatetime_around_every_month_start():
+    starts, _ = jalali._table()
+    for ordinal in starts:
+        for d in (date.fromordinal(ordinal) + timedelta(days=offset) for offset in (-1, 0, 1)):
+            assert jalali.to_shamsi_year_month(d) == _expected(d), d
+
+@pytest.mark.parametrize(
+    "d, expected",
+    [
+        # 1399 and 1403 are leap years, so Esfand has 30 days.
+        (date(2021, 3, 20), (1399, 12)),
+        (date(2021, 3, 21), (1400, 1)),
+        (date(2025, 3, 20), (1403, 12)),
+        (date(2025, 3, 21), (1404, 1)),
+        (date(2022, 3, 20), (1400, 12)),
+        (date(2022, 3, 21), (1401, 1)),
+        (date(2024, 2, 29), (1402, 12)),
+        (date(2016, 2, 29), (1394, 12)),
+        (date(2000, 1, 1), (1378, 10)),
+        (date(2050, 12, 31), (1429, 10)),
+    ],
+)
+def test_year_boundaries(d, expected):
+    assert jalali.to_shamsi_year_month(d) == expected == _expected(d)
+
+@pytest.mark.parametrize("d", [date(1999, 3, 20), date(1970, 3, 21), date(2051, 6, 1), date(2100, 3, 20)])
+def test_dates_outside_the_table_fall_back_to_jdatetime(d):
+    starts, _ = jalali._table()
+    assert not starts[0] <= d.toordinal() < starts[-1]
+    assert jalali.to_shamsi_year_month(d) == _expected(d)
+
+def test_every_day_in_range():
+    d, end = date(2015, 1, 1), date(2030, 1, 1)
+    while d < end:
+        assert jalali.to_shamsi_year_month(d) == _expected(d), d
+        d += timedelta(days=1)
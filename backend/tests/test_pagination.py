@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import base64
+
+import pytest
+
+from app.api.pagination import encode_cursor
+from conftest import add_expense, add_payment
+
+# Rows dated in Shamsi 1396, which no other test touches.
+RANGE = {"from": "1396-01", "to": "1396-12"}
+
+@pytest.fixture(scope="module")
+def paged_rows(client, users):
+    for day in range(1, 8):
+        add_expense(client, users, 3, f"{day}.00", [3, 4], f"2017-06-{day:02d}", approve=False)
+        add_payment(client, users, 3, 4, f"{day}.00", f"2017-06-{day:02d}")
+
+def _walk(client, path: str, headers: dict, limit: int) -> tuple[list[int], int]:
+    ids: list[int] = []
+    pages = 0
+    params = {**RANGE, "limit": limit}
+    while True:
+        r = client.get(path, params=params, headers=headers)
+        assert r.status_code == 200, r.text
+        assert len(r.json()) <= limit
+        ids.extend(row["id"] for row in r.json())
+        pages += 1
+        if "x-next-cursor" not in r.headers:
+            return ids, pages
+        params["cursor"] = r.headers["x-next-cursor"]
+
+@pytest.mark.parametrize("path", ["/api/v1/expenses", "/api/v1/payments"])
+def test_cursor_pages_cover_the_list_once(client, users, paged_rows, path):
+    full = [row["id"] for row in client.get(path, params=RANGE, headers=users[3]).json()]
+    assert len(full) == 7 and full == sorted(full, reverse=True)
+    ids, pages = _walk(client, path, users[3], 3)
+    assert ids == full
+    assert pages == 3
+
+@pytest.mark.parametrize("path", ["/api/v1/expenses", "/api/v1/payments"])
+def test_cursor_pages_are_stable_under_inserts(client, users, paged_rows, path):
+    r = client.get(path, params={**RANGE, "limit": 2}, headers=users[3])
+    first = [row["id"] for row in r.json()]
+    # A row created between pages sorts before the cursor and doesn't shift later pages.
+    if path.endswith("expenses"):
+        add_expense(client, users, 3, "99.00", [3, 4], "2017-06-20", approve=False)
+    else:
+        add_payment(client, users, 3, 4, "99.00", "2017-06-20")
+    r = client.get(path, params={**RANGE, "limit": 2, "cursor": r.headers["x-next-cursor"]}, headers=users[3])
+    second = [row["id"] for row in r.json()]
+    assert max(second) < min(first)
+    assert second == sorted(second, reverse=True)
+
+def _b64(raw: str) -> str:
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+@pytest.mark.parametrize("path", ["/api/v1/expenses", "/api/v1/payments"])
+@pytest.mark.parametrize("cursor", ["not a cursor!", _b64("pk:12"), _b64("id:twelve"), "////", _b64("id:")])
+def test_invalid_cursor(client, users, path, cursor):
+    r = client.get(path, params={"cursor": cursor}, headers=users[3])
+    assert r.status_code == 400, r.text
+    assert r.json()["detail"] == "Invalid cursor"
+
+@pytest.mark.parametrize("path", ["/api/v1/expenses", "/api/v1/payments"])
+@pytest.mark.parametrize(
+    "params, status",
+    [
+        ({"per_page": 0}, 200),
+        ({"per_page": -1}, 200),
+        ({"per_page": 0, "page": 1}, 400),
+        ({"page": 0}, 400),
+        ({"per_page": 0, "cursor": encode_cursor(10**9)}, 400),
+        ({"per_page": 0, "cursor": encode_cursor(10**9), "limit": 5}, 200),
+        ({"limit": 0}, 400),
+        ({"page": 1, "limit": 5}, 400),
+    ],
+)
+def test_paging_parameter_validation(client, users, path, params, status):
+    r = client.get(path, params=params, headers=users[3])
+    assert r.status_code == status, r.text
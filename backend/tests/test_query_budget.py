@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import pytest
+
+EXPENSES = 20
+
+def _expense(i: int, participants: list[int] | None = None) -> dict:
+    return {
+        "amount": 100 + i,
+        "description": f"dinner {i}",
+        "expense_date": f"2025-0{i % 9 + 1}-15",
+        "participant_user_ids": participants or [1, 2, 3, 4, 5][: 2 + i % 4],
+    }
+
+@pytest.fixture(scope="module")
+def expense_ids(client, users):
+    r = client.post("/api/v1/expenses/batch", json=[_expense(i) for i in range(EXPENSES)], headers=users[0])
+    assert r.status_code == 200, r.text
+    ids = [row["expense_id"] for row in r.json()]
+    # Approve half of them by everyone, so lists mix pending and approved rows.
+    for headers in users:
+        r = client.post("/api/v1/expenses/approve", json={"expense_ids": ids[::2]}, headers=headers)
+        assert r.status_code == 200, r.text
+    return ids
+
+# Budgets are per request and must not depend on the number of rows returned.
+@pytest.mark.parametrize(
+    "params, budget",
+    [
+        ({}, 2),
+        ({"scope": "all"}, 2),
+        ({"page": 1, "per_page": 50}, 3),
+        ({"limit": 50}, 2),
+        ({"limit": 50, "with_count": True, "q": "dinner"}, 3),
+        ({"from": "1403-10", "to": "1404-12", "scope": "all"}, 2),
+    ],
+)
+def test_list_expenses(client, users, expense_ids, params, budget):
+    with client.query_budget(budget, f"GET /expenses {params}"):
+        r = client.get("/api/v1/expenses", params=params, headers=users[1])
+    assert r.status_code == 200, r.text
+    assert len(r.json()) >= 5
+
+def test_search_expenses(client, users, expense_ids):
+    with client.query_budget(2, "GET /expenses/search"):
+        r = client.get("/api/v1/expenses/search", params={"q": "dinner", "limit": 100}, headers=users[1])
+    assert r.status_code == 200, r.text
+    assert len(r.json()) >= 5
+
+def test_pending_my_approvals(client, users, expense_ids):
+    with client.query_budget(2, "GET /expenses/pending-my-approvals"):
+        r = client.get("/api/v1/expenses/pending-my-approvals", headers=users[1])
+    assert r.status_code == 200, r.text
+    assert len(r.json()) >= 5
+
+def test_export_expenses(client, users, expense_ids):
+    with client.query_budget(1, "GET /expenses/export"):
+        r = client.get("/api/v1/expenses/export", params={"format": "ndjson", "scope": "all"}, headers=users[0])
+    assert r.status_code == 200, r.text
+    assert len(r.text.splitlines()) >= EXPENSES
+
+# The ORM inserts expenses one by one to get their ids (MySQL has no
+# RETURNING); everything else must stay constant.
+def test_create_batch(client, users):
+    payload = [_expense(i) for i in range(EXPENSES)]
+    with client.query_budget(EXPENSES + 2, "POST /expenses/batch"):
+        r = client.post("/api/v1/expenses/batch", json=payload, headers=users[0])
+    assert r.status_code == 200, r.text
+    assert all(row["ok"] for row in r.json())
+
+def test_bulk_approve(client, users):
+    payload = [_expense(i, [1, 2, 3, 4, 5]) for i in range(EXPENSES)]
+    r = client.post("/api/v1/expenses/batch", json=payload, headers=users[0])
+    ids = [row["expense_id"] for row in r.json()]
+    for headers in users[1:-1]:
+        with client.query_budget(3, "POST /expenses/approve"):
+            r = client.post("/api/v1/expenses/approve", json={"expense_ids": ids}, headers=headers)
+        assert r.status_code == 200, r.text
+    # The last participant completes every expense, which also writes the
+    # ledger and the monthly summary.
+    with client.query_budget(8, "POST /expenses/approve (completing)"):
+        r = client.post("/api/v1/expenses/approve", json={"expense_ids": ids}, headers=users[-1])
+    assert r.status_code == 200, r.text
+    assert all(row["expense_status"] == "approved" for row in r.json())
+
+def test_approve(client, users):
+    r = client.post("/api/v1/expenses", json=_expense(0, [1, 2, 3, 4, 5]), headers=users[0])
+    expense_id = r.json()["id"]
+    for headers in users[1:-1]:
+        with client.query_budget(3, "POST /expenses/{id}/approve"):
+            r = client.post(f"/api/v1/expenses/{expense_id}/approve", headers=headers)
+        assert r.status_code == 200, r.text
+    with client.query_budget(6, "POST /expenses/{id}/approve (completing)"):
+        r = client.post(f"/api/v1/expenses/{expense_id}/approve", headers=users[-1])
+    assert r.status_code == 200, r.text
+    assert r.json()["expense_status"] == "approved"
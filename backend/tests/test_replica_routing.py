@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from collections import Counter
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app.api.conditional import bump_data_version
+from app.core import database
+from app.core.database import engine, replica_engines
+
+@pytest.fixture(scope="module")
+def statements():
+    counts: Counter[str] = Counter()
+    listeners = [(engine, "primary"), *((replica, "replica") for replica in replica_engines)]
+
+    def listener(name):
+        def count(conn, cursor, statement, parameters, context, executemany):
+            counts[name] += 1
+        return count
+
+    registered = [(e, listener(name)) for e, name in listeners]
+    for e, fn in registered:
+        event.listen(e, "after_cursor_execute", fn)
+    yield counts
+    for e, fn in registered:
+        event.remove(e, "after_cursor_execute", fn)
+
+@contextmanager
+def _counting(counts: Counter):
+    counts.clear()
+    yield counts
+
+@pytest.fixture(autouse=True)
+def _no_sticky_users():
+    database._recent_writers.clear()
+    bump_data_version()
+
+def test_reads_go_to_the_replica(client, users, statements):
+    with _counting(statements):
+        r = client.get("/api/v1/payments", headers=users[1])
+    assert r.status_code == 200, r.text
+    assert statements["replica"] > 0 and statements["primary"] == 0
+
+def test_writer_reads_from_the_primary(client, users, statements):
+    r = client.post("/api/v1/payments", json={"to_user_id": 3, "amount": 10, "payment_date": "2025-05-05"}, headers=users[1])
+    assert r.status_code == 200, r.text
+    with _counting(statements):
+        assert client.get("/api/v1/payments", headers=users[1]).status_code == 200
+    assert statements["primary"] > 0 and statements["replica"] == 0
+    with _counting(statements):
+        assert client.get("/api/v1/payments", headers=users[2]).status_code == 200
+    assert statements["replica"] > 0 and statements["primary"] == 0
+
+def test_writes_in_a_read_session_go_to_the_primary(statements):
+    with database.SessionLocal() as db:
+        db.info["replica"] = replica_engines[0]
+        with _counting(statements):
+            db.execute(database.Base.metadata.tables["users"].update().where(False).values(first_name="x"))
+            db.commit()
+    assert statements["primary"] == 1 and statements["replica"] == 0
+
+def test_replica_responses_are_not_cached(client, users, statements):
+    for _ in range(2):
+        with _counting(statements):
+            assert client.get("/api/v1/settlements", params={"to": "1404-12"}, headers=users[1]).status_code == 200
+        assert statements["replica"] > 0
+    # Built from the primary (sticky writer): cached, the repeat runs no SQL.
+    client.post("/api/v1/payments", json={"to_user_id": 3, "amount": 10, "payment_date": "2025-05-05"}, headers=users[1])
+    client.get("/api/v1/settlements", params={"to": "1404-12"}, headers=users[1])
+    with _counting(statements):
+        assert client.get("/api/v1/settlements", params={"to": "1404-12"}, headers=users[1]).status_code == 200
+    assert sum(statements.values()) == 0
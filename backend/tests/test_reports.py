@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+
+from app.core.jalali import to_shamsi_year_month
+from conftest import add_expense, add_payment
+
+RANGE = {"from": "1394-01", "to": "1394-03"}
+
+# Shamsi 1394, which no other test touches:
+#   1394-01: user 1 pays 90.00 for users 1-3, user 2 pays user 1 back 30.00
+#   1394-03: user 2 pays 40.00 for users 2-3; user 3's 10.00 expense stays pending
+@pytest.fixture(scope="module")
+def report_data(client, users):
+    add_expense(client, users, 0, "90.00", [0, 1, 2], "2015-04-10")
+    add_payment(client, users, 1, 0, "30.00", "2015-04-12")
+    add_expense(client, users, 1, "40.00", [1, 2], "2015-05-25")
+    add_expense(client, users, 2, "10.00", [2, 0], "2015-05-26", approve=False)
+
+@pytest.mark.parametrize(
+    "index, expected",
+    [
+        (0, {"spent": ["30.00", "0.00", "0.00"], "paid": ["90.00", "0.00", "0.00"],
+             "payments_sent": ["0.00", "0.00", "0.00"], "payments_received": ["30.00", "0.00", "0.00"],
+             "owed": ["30.00", "0.00", "0.00"]}),
+        (1, {"spent": ["30.00", "0.00", "20.00"], "paid": ["0.00", "0.00", "40.00"],
+             "payments_sent": ["30.00", "0.00", "0.00"], "payments_received": ["0.00", "0.00", "0.00"],
+             "owed": ["0.00", "0.00", "20.00"]}),
+        (2, {"spent": ["30.00", "0.00", "20.00"], "paid": ["0.00", "0.00", "0.00"],
+             "payments_sent": ["0.00", "0.00", "0.00"], "payments_received": ["0.00", "0.00", "0.00"],
+             "owed": ["-30.00", "0.00", "-20.00"]}),
+    ],
+)
+def test_monthly_report_per_user(client, users, report_data, index, expected):
+    r = client.get("/api/v1/reports/monthly", params=RANGE, headers=users[index])
+    assert r.status_code == 200, r.text
+    assert r.json() == {"user_id": index + 1, "periods": ["1394-01", "1394-02", "1394-03"], **expected}
+
+def test_monthly_report_group_totals(client, users, report_data):
+    r = client.get("/api/v1/reports/monthly", params={**RANGE, "scope": "all"}, headers=users[0])
+    assert r.status_code == 200, r.text
+    assert r.json() == {
+        "user_id": None,
+        "periods": ["1394-01", "1394-02", "1394-03"],
+        "spent": ["90.00", "0.00", "40.00"],
+        "paid": ["90.00", "0.00", "40.00"],
+        "payments_sent": ["30.00", "0.00", "0.00"],
+        "payments_received": ["30.00", "0.00", "0.00"],
+        "owed": ["0.00", "0.00", "0.00"],
+    }
+
+def test_monthly_report_defaults_to_last_twelve_months(client, users):
+    r = client.get("/api/v1/reports/monthly", headers=users[1])
+    assert r.status_code == 200, r.text
+    year, month = to_shamsi_year_month(date.today())
+    assert len(r.json()["periods"]) == 12
+    assert r.json()["periods"][-1] == f"{year}-{month:02d}"
+
+@pytest.mark.parametrize(
+    "index, params, status",
+    [
+        (1, {**RANGE, "scope": "all"}, 403),
+        (0, {"from": "1394-03", "to": "1394-01"}, 400),
+        (0, {"from": "1380-01", "to": "1394-01"}, 400),
+        (0, {"from": "1394-13", "to": "1394-01"}, 400),
+    ],
+)
+def test_monthly_report_errors(client, users, index, params, status):
+    r = client.get("/api/v1/reports/monthly", params=params, headers=users[index])
+    assert r.status_code == status, r.text
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_UP
+
+import pytest
+from sqlalchemy import select
+
+from app.api.conditional import bump_data_version
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.jalali import shamsi_period
+from app.models import Expense, ExpenseParticipant, Payment, User
+from app.schemas.settlement import SettlementReport, TransferSuggestion, UserBalance
+from app.services import ledger, summary
+from conftest import add_expense, add_payment
+
+# Everything here happens in Shamsi 1397, which no other test touches.
+RANGE = {"from": "1397-01", "to": "1397-12"}
+START, END = shamsi_period(1397, 1), shamsi_period(1397, 12)
+
+def _round2(x: Decimal) -> Decimal:
+    return x.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+@pytest.fixture(scope="module")
+def rollup_data(client, users):
+    add_expense(client, users, 0, "100.00", [0, 1, 2], "2018-05-10")
+    weighted = add_expense(
+        client, users, 1, "50.01", [1, 3, 4], "2018-05-12", approve=False,
+        split="weighted", weights={"2": "1", "4": "2", "5": "3.5"},
+    )
+    exact = add_expense(
+        client, users, 2, "80.00", [2, 0], "2018-08-10", approve=False,
+        split="exact", share_amounts={"3": "30.55", "1": "49.45"},
+    )
+    add_expense(client, users, 3, "12.34", [3, 0], "2018-08-11", approve=False)
+    doomed = add_expense(client, users, 4, "7.00", [4, 1], "2018-08-12", approve=False)
+    for headers in (users[0], users[3], users[4]):
+        r = client.post("/api/v1/expenses/approve", json={"expense_ids": [weighted, exact]}, headers=headers)
+        assert r.status_code == 200, r.text
+    assert client.delete(f"/api/v1/expenses/{doomed}", headers=users[0]).status_code == 204
+    add_payment(client, users, 2, 0, "20.00", "2018-05-20")
+    r = client.post(
+        "/api/v1/payments/batch",
+        json=[
+            {"to_user_id": 2, "amount": "10.10", "payment_date": "2018-08-15"},
+            {"to_user_id": 5, "amount": "3.03", "payment_date": "2018-08-16"},
+        ],
+        headers=users[3],
+    )
+    assert r.status_code == 200, r.text
+
+# The per-expense scan settlements did before the ledger, limited to RANGE.
+def _raw_balances(current_id: int) -> tuple[dict[int, Decimal], dict[int, Decimal]]:
+    with SessionLocal() as db:
+        user_ids = db.scalars(select(User.id).where(User.is_approved == True)).all()  # noqa: E712
+        net = {uid: Decimal("0.00") for uid in user_ids}
+        my_net = {uid: Decimal("0.00") for uid in user_ids if uid != current_id}
+        expenses = db.scalars(
+            select(Expense).where(Expense.status == "approved", Expense.shamsi_period.between(START, END))
+        ).all()
+        for e in expenses:
+            parts = db.scalars(select(ExpenseParticipant).where(ExpenseParticipant.expense_id == e.id)).all()
+            for p in parts:
+                if p.user_id == e.payer_id:
+                    continue
+                net[p.user_id] -= p.share_amount
+                net[e.payer_id] += p.share_amount
+                if e.payer_id == current_id and p.user_id in my_net:
+                    my_net[p.user_id] += p.share_amount
+                elif p.user_id == current_id and e.payer_id in my_net:
+                    my_net[e.payer_id] -= p.share_amount
+        for pay in db.scalars(select(Payment).where(Payment.shamsi_period.between(START, END))):
+            net[pay.from_user_id] += pay.amount
+            net[pay.to_user_id] -= pay.amount
+            if pay.from_user_id == current_id and pay.to_user_id in my_net:
+                my_net[pay.to_user_id] += pay.amount
+            elif pay.to_user_id == current_id and pay.from_user_id in my_net:
+                my_net[pay.from_user_id] -= pay.amount
+    return net, my_net
+
+def _balances(rows: list[dict]) -> dict[int, Decimal]:
+    return {row["user_id"]: Decimal(row["balance"]) for row in rows}
+
+def test_ledger_matches_raw_rows(rollup_data):
+    with SessionLocal() as db:
+        assert ledger.drift(db) == {}
+        assert any(shamsi_period(y, m) == shamsi_period(1397, 5) for _, _, y, m in ledger.stored(db))
+
+@pytest.mark.parametrize("index", range(5))
+def test_settlement_matches_raw_scan(client, users, rollup_data, index):
+    net, my_net = _raw_balances(index + 1)
+    r = client.get("/api/v1/settlements", params=RANGE, headers=users[index])
+    assert r.status_code == 200, r.text
+    assert _balances(r.json()["my_balances"]) == {uid: _round2(v) for uid, v in my_net.items() if v}
+    if index == 0:
+        r = client.get("/api/v1/settlements", params={**RANGE, "scope": "all"}, headers=users[0])
+        assert _balances(r.json()["balances"]) == {uid: _round2(v) for uid, v in net.items()}
+        assert any(net.values())
+
+# The Decimal report built before balances moved to integer cents, with its
+# greedy matching and rounding thresholds.
+def _decimal_report(current_id: int, is_admin_view: bool) -> dict:
+    net, my_net = _raw_balances(current_id)
+    transfers = []
+    if is_admin_view:
+        debtors = sorted(((uid, -bal) for uid, bal in net.items() if bal < 0), key=lambda x: x[1], reverse=True)
+        creditors = sorted(((uid, bal) for uid, bal in net.items() if bal > 0), key=lambda x: x[1], reverse=True)
+        i = j = 0
+        while i < len(debtors) and j < len(creditors):
+            (d_uid, d_amt), (c_uid, c_amt) = debtors[i], creditors[j]
+            x = _round2(min(d_amt, c_amt))
+            if x > 0:
+                transfers.append(TransferSuggestion(from_user_id=d_uid, to_user_id=c_uid, amount=x))
+            debtors[i], creditors[j] = (d_uid, d_amt - x), (c_uid, c_amt - x)
+            if d_amt - x <= Decimal("0.0001"):
+                i += 1
+            if c_amt - x <= Decimal("0.0001"):
+                j += 1
+    return SettlementReport(
+        shamsi_year=1397,
+        shamsi_month=12,
+        balances=[UserBalance(user_id=uid, balance=_round2(bal)) for uid, bal in net.items()] if is_admin_view else [],
+        my_balances=[
+            UserBalance(user_id=uid, balance=_round2(bal)) for uid, bal in my_net.items() if abs(bal) > Decimal("0.0001")
+        ],
+        transfers=transfers,
+    ).model_dump(mode="json")
+
+@pytest.mark.parametrize("index, scope", [(0, "all"), *((i, None) for i in range(5))])
+def test_settlement_matches_decimal_report(client, users, rollup_data, monkeypatch, index, scope):
+    monkeypatch.setattr(settings, "SETTLEMENT_STRATEGY", "greedy")
+    bump_data_version()
+    r = client.get("/api/v1/settlements", params={**RANGE, "scope": scope} if scope else RANGE, headers=users[index])
+    assert r.status_code == 200, r.text
+    assert r.json() == _decimal_report(index + 1, scope == "all")
+
+# Per-user monthly totals straight from the raw rows, limited to RANGE.
+def _raw_summary() -> dict[tuple[int, int, int], dict[str, Decimal]]:
+    totals = defaultdict(lambda: dict.fromkeys(summary.FIELDS, Decimal("0.00")))
+    with SessionLocal() as db:
+        expenses = db.scalars(
+            select(Expense).where(Expense.status == "approved", Expense.shamsi_period.between(START, END))
+        ).all()
+        for e in expenses:
+            totals[(e.payer_id, e.shamsi_year, e.shamsi_month)]["paid"] += e.amount
+            for p in e.participants:
+                totals[(p.user_id, e.shamsi_year, e.shamsi_month)]["spent"] += p.share_amount
+                if p.user_id != e.payer_id:
+                    totals[(e.payer_id, e.shamsi_year, e.shamsi_month)]["owed"] += p.share_amount
+                    totals[(p.user_id, e.shamsi_year, e.shamsi_month)]["owed"] -= p.share_amount
+        for pay in db.scalars(select(Payment).where(Payment.shamsi_period.between(START, END))):
+            sender = totals[(pay.from_user_id, pay.shamsi_year, pay.shamsi_month)]
+            receiver = totals[(pay.to_user_id, pay.shamsi_year, pay.shamsi_month)]
+            sender["payments_sent"] += pay.amount
+            sender["owed"] += pay.amount
+            receiver["payments_received"] += pay.amount
+            receiver["owed"] -= pay.amount
+    return dict(totals)
+
+def test_summary_matches_raw_rows(rollup_data):
+    expected = _raw_summary()
+    with SessionLocal() as db:
+        assert summary.drift(db) == {}
+        stored = {
+            key: {f: values.get(f, Decimal("0.00")) for f in summary.FIELDS}
+            for key, values in summary.stored(db).items()
+            if START <= shamsi_period(key[1], key[2]) <= END
+        }
+    assert stored == expected
+    assert len(expected) > 5
+
+@pytest.mark.parametrize("index", [None, *range(5)])
+def test_monthly_report_matches_raw_rows(client, users, rollup_data, index):
+    expected = _raw_summary()
+    if index is None:
+        r = client.get("/api/v1/reports/monthly", params={**RANGE, "scope": "all"}, headers=users[0])
+    else:
+        r = client.get("/api/v1/reports/monthly", params=RANGE, headers=users[index])
+    assert r.status_code == 200, r.text
+    report = r.json()
+    for i, period in enumerate(report["periods"]):
+        month = int(period[-2:])
+        for field in summary.FIELDS:
+            want = sum(
+                (v[field] for (uid, _, m), v in expected.items() if m == month and index in (None, uid - 1)),
+                Decimal("0.00"),
+            )
+            assert Decimal(report[field][i]) == want, (period, field)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+import pytest
+
+from app.api.v1.endpoints.expenses import _parse_amount_query
+
+@pytest.fixture(scope="module")
+def searchable(client, users):
+    ids = {}
+    for key, amount, description in [
+        ("text", 50, "taxi 7777 receipt"),
+        ("amount", 7777, "groceries"),
+        ("range", 7500.5, "zebra crossing"),
+        ("other", 9100, "museum tickets"),
+    ]:
+        r = client.post(
+            "/api/v1/expenses",
+            json={"amount": amount, "description": description, "expense_date": "2025-03-15", "participant_user_ids": [1, 2]},
+            headers=users[0],
+        )
+        assert r.status_code == 200, r.text
+        ids[key] = r.json()["id"]
+    return ids
+
+@pytest.mark.parametrize(
+    "q, expected",
+    [
+        ("1500", (Decimal("1500"), Decimal("1500"))),
+        ("1,500.25", (Decimal("1500.25"), Decimal("1500.25"))),
+        ("1000-2000", (Decimal("1000"), Decimal("2000"))),
+        ("2000..1000", (Decimal("1000"), Decimal("2000"))),
+        (" 1 000 - 2 000 ", (Decimal("1000"), Decimal("2000"))),
+        ("taxi", None),
+        ("10-", None),
+        ("inf", None),
+        ("NaN", None),
+    ],
+)
+def test_parse_amount_query(q, expected):
+    assert _parse_amount_query(q) == expected
+
+def test_search_ranks_amount_hits_first(client, users, searchable):
+    r = client.get("/api/v1/expenses/search", params={"q": "7777"}, headers=users[1])
+    assert r.status_code == 200, r.text
+    ids = [e["id"] for e in r.json()]
+    assert ids[:2] == [searchable["amount"], searchable["text"]]
+
+def test_search_amount_range(client, users, searchable):
+    r = client.get("/api/v1/expenses/search", params={"q": "7000-8000"}, headers=users[1])
+    assert r.status_code == 200, r.text
+    ids = {e["id"] for e in r.json()}
+    assert {searchable["amount"], searchable["range"]} <= ids
+    assert not ids & {searchable["text"], searchable["other"]}
+
+@pytest.mark.parametrize("path", ["/api/v1/expenses", "/api/v1/expenses/search"])
+def test_single_character_text_query(client, users, searchable, path):
+    r = client.get(path, params={"q": "z", "scope": "all"}, headers=users[0])
+    assert r.status_code == 200, r.text
+    ids = {e["id"] for e in r.json()}
+    assert searchable["range"] in ids
+    assert searchable["amount"] not in ids
+
+def test_single_digit_query_matches_text_and_amount(client, users, searchable):
+    r = client.get("/api/v1/expenses", params={"q": "7", "limit": 100}, headers=users[1])
+    assert r.status_code == 200, r.text
+    ids = {e["id"] for e in r.json()}
+    assert searchable["text"] in ids
+    assert searchable["amount"] not in ids
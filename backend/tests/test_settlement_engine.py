@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from app.services import settlement
+
+def _random_balances(rng: random.Random, users: int) -> dict[int, int]:
+    balances = {uid: rng.randint(-50_000, 50_000) for uid in range(1, users)}
+    balances[users] = -sum(balances.values())
+    return balances
+
+def _assert_valid(balances: dict[int, int], transfers: list[settlement.Transfer]) -> None:
+    remaining = dict(balances)
+    for debtor, creditor, cents in transfers:
+        assert cents > 0 and debtor != creditor
+        remaining[debtor] += cents
+        remaining[creditor] -= cents
+    assert not any(remaining.values())
+
+@pytest.mark.parametrize("strategy", sorted(settlement.STRATEGIES))
+@pytest.mark.parametrize("users", [2, 5, 12, 40])
+def test_transfers_conserve_balances(strategy, users):
+    rng = random.Random(users)
+    for _ in range(20):
+        balances = _random_balances(rng, users)
+        _assert_valid(balances, settlement.settle(balances, strategy))
+
+def test_exact_beats_greedy_when_groups_cancel():
+    # {1, 4} and {2, 3, 5} settle on their own: 3 transfers instead of greedy's 4.
+    balances = {1: -500, 2: -300, 3: -400, 4: 500, 5: 700}
+    assert len(settlement.greedy(balances)) == 4
+    for strategy in ("exact", "heuristic"):
+        transfers = settlement.settle(balances, strategy)
+        _assert_valid(balances, transfers)
+        assert len(transfers) == 3
+
+def test_exact_minimises_transfers():
+    rng = random.Random(7)
+    for _ in range(50):
+        balances = _random_balances(rng, 8)
+        # Make some zero-sum subgroups likely.
+        balances[1], balances[2] = 1234, -1234
+        balances[3], balances[4], balances[5] = 300, 200, -500
+        balances[8] = -sum(v for uid, v in balances.items() if uid != 8)
+        exact = settlement.settle(balances, "exact")
+        _assert_valid(balances, exact)
+        assert len(exact) <= len(settlement.settle(balances, "heuristic"))
+        assert len(exact) <= len(settlement.greedy(balances))
+
+def _spy_heuristic(monkeypatch) -> list:
+    calls = []
+    heuristic = settlement.heuristic
+
+    def spy(balances, deadline=None):
+        calls.append(balances)
+        return heuristic(balances, deadline)
+
+    monkeypatch.setattr(settlement, "heuristic", spy)
+    return calls
+
+def test_exact_falls_back_above_max_users(monkeypatch):
+    monkeypatch.setattr(settlement, "EXACT_MAX_USERS", 4)
+    calls = _spy_heuristic(monkeypatch)
+    balances = _random_balances(random.Random(1), 10)
+    _assert_valid(balances, settlement.settle(balances, "exact"))
+    assert calls == [balances]
+
+def test_exact_falls_back_when_time_budget_runs_out(monkeypatch):
+    calls = _spy_heuristic(monkeypatch)
+    # The DP checks the deadline every 1024 masks, so it needs more than 10 users.
+    balances = _random_balances(random.Random(2), 14)
+    _assert_valid(balances, settlement.settle(balances, "exact", time_budget_ms=0))
+    assert calls == [balances]
+    assert settlement.settle(balances, "exact", time_budget_ms=None)
+    assert len(calls) == 1
+
+def test_unbalanced_input_falls_back_to_greedy():
+    balances = {1: -300, 2: 200}
+    for strategy in settlement.STRATEGIES:
+        assert settlement.settle(balances, strategy) == [(1, 2, 200)]
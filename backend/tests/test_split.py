@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import random
+from decimal import Decimal
+
+import pytest
+
+from app.services import split
+
+def test_largest_remainder_sums_to_total():
+    rng = random.Random(3)
+    for _ in range(500):
+        weights = [rng.randint(1, 10_000) for _ in range(rng.randint(1, 12))]
+        total = rng.randint(0, 10_000_000)
+        shares = split.largest_remainder(total, weights)
+        assert sum(shares) == total
+        assert all(share >= 0 for share in shares)
+
+@pytest.mark.parametrize(
+    "total, weights, expected",
+    [
+        (10000, [1, 1, 1], [3334, 3333, 3333]),
+        (2, [1, 1, 1], [1, 1, 0]),
+        (1000, [1, 2], [333, 667]),
+        (100, [3, 1, 3], [43, 14, 43]),
+        (5, [7], [5]),
+    ],
+)
+def test_largest_remainder_places_leftover_deterministically(total, weights, expected):
+    assert split.largest_remainder(total, weights) == expected
+
+def test_integer_weights_scale_and_cap_places():
+    assert split._integer_weights([Decimal("0.5"), Decimal("1.25"), Decimal(2)]) == [50, 125, 200]
+    assert split._integer_weights([Decimal("1e-7"), Decimal(1)]) == [0, 1_000_000]
+
+def test_split_amount():
+    assert split.split_amount(Decimal("100.00"), [Decimal(1)] * 3) == [Decimal("33.34"), Decimal("33.33"), Decimal("33.33")]
+    assert split.split_amount(Decimal("50.01"), [Decimal(1), Decimal(2), Decimal("3.5")]) == [
+        Decimal("7.69"), Decimal("15.39"), Decimal("26.93"),
+    ]
+
+def _post(client, users, **fields):
+    payload = {"amount": "10.00", "expense_date": "2025-05-01", "participant_user_ids": [1, 2], **fields}
+    return client.post("/api/v1/expenses", json=payload, headers=users[0])
+
+def test_weighted_and_exact_shares(client, users):
+    r = _post(client, users, split="weighted", weights={"1": "1", "2": "2"})
+    assert r.status_code == 200, r.text
+    assert {p["user_id"]: p["share_amount"] for p in r.json()["participants"]} == {1: "3.33", 2: "6.67"}
+    r = _post(client, users, split="exact", share_amounts={"1": "2.50", "2": "7.50"})
+    assert r.status_code == 200, r.text
+    assert {p["user_id"]: p["share_amount"] for p in r.json()["participants"]} == {1: "2.50", 2: "7.50"}
+
+@pytest.mark.parametrize(
+    "fields, status",
+    [
+        ({"split": "weighted"}, 400),
+        ({"split": "weighted", "weights": {"1": "1"}}, 400),
+        ({"split": "weighted", "weights": {"1": "1", "2": "1", "3": "1"}}, 400),
+        ({"split": "weighted", "weights": {"1": "1", "2": "0"}}, 422),
+        ({"split": "weighted", "weights": {"1": "1", "2": "-1"}}, 422),
+        ({"split": "weighted", "weights": {"1": "1", "2": "0.0000001"}}, 422),
+        ({"split": "exact"}, 400),
+        ({"split": "exact", "share_amounts": {"1": "5.00", "2": "4.99"}}, 400),
+        ({"split": "exact", "share_amounts": {"1": "10.00"}}, 400),
+        ({"split": "exact", "share_amounts": {"1": "5.001", "2": "4.999"}}, 422),
+        ({"split": "exact", "share_amounts": {"1": "11.00", "2": "-1.00"}}, 422),
+        ({"weights": {"1": "1", "2": "1"}}, 422),
+        ({"split": "equal", "share_amounts": {"1": "5.00", "2": "5.00"}}, 422),
+        ({"split": "exact", "share_amounts": {"1": "5.00", "2": "5.00"}, "weights": {"1": "1", "2": "1"}}, 422),
+    ],
+)
+def test_split_validation_errors(client, users, fields, status):
+    r = _post(client, users, **fields)
+    assert r.status_code == status, r.text
@@ -29,11 +29,11 @@ export default function LoginPage() {
     e.preventDefault();
     setLoading(true);
     try {
-      const tok = await apiFetch<{ access_token: string; token_type: string }>("/auth/login", {
+      const tok = await apiFetch<{ access_token: string; refresh_token: string; token_type: string }>("/auth/login", {
         method: "POST",
         body: JSON.stringify({ username, password }),
       });
-      await setAuth(tok.access_token);
+      await setAuth(tok.access_token, tok.refresh_token);
       const me = await apiFetch<any>("/users/me", { auth: true });
       if (!me.is_approved) router.replace("/waiting-approval");
       else router.replace(nextUrl);
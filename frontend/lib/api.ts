@@ -1,4 +1,4 @@
-import { getToken, clearToken } from "@/lib/auth";
+import { getToken, getRefreshToken, setToken, clearToken } from "@/lib/auth";
 
 const RAW_API_BASE = process.env.NEXT_PUBLIC_API_BASE_URL;
 const API_BASE = RAW_API_BASE ? RAW_API_BASE.replace(/\/+$/, "") : undefined;
@@ -10,7 +10,32 @@ if (!API_BASE) {
 
 type FetchOptions = RequestInit & { auth?: boolean };
 
-async function request<T>(path: string, options: FetchOptions = {}): Promise<{ data: T; headers: Headers }> {
+let refreshing: Promise<boolean> | null = null;
+
+async function refreshTokens(): Promise<boolean> {
+  const refreshToken = getRefreshToken();
+  if (!refreshToken) return false;
+  if (!refreshing) {
+    refreshing = fetch(`${API_BASE}/auth/refresh`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ refresh_token: refreshToken }),
+    })
+      .then(async (res) => {
+        if (!res.ok) return false;
+        const tok = await res.json();
+        setToken(tok.access_token, tok.refresh_token);
+        return true;
+      })
+      .catch(() => false)
+      .finally(() => {
+        refreshing = null;
+      });
+  }
+  return refreshing;
+}
+
+async function request<T>(path: string, options: FetchOptions = {}, retried = false): Promise<{ data: T; headers: Headers }> {
   const headers = new Headers(options.headers || {});
   headers.set("Content-Type", "application/json");
 
@@ -26,6 +51,7 @@ async function request<T>(path: string, options: FetchOptions = {}): Promise<{ d
   });
 
   if (res.status === 401) {
+    if (options.auth && !retried && (await refreshTokens())) return request<T>(path, options, true);
     clearToken();
     if (typeof window !== "undefined") window.location.href = "/login";
     throw new Error("Unauthorized");
@@ -9,7 +9,7 @@ type AuthState = {
   token: string | null;
   user: User | null;
   loading: boolean;
-  setAuth: (token: string) => Promise<void>;
+  setAuth: (token: string, refreshToken?: string) => Promise<void>;
   refreshMe: () => Promise<User | null>;
   logout: () => void;
 };
@@ -47,8 +47,8 @@ export function AuthProvider({ children }: { children: React.ReactNode }) {
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, []);
 
-  const setAuth = async (newToken: string) => {
-    setToken(newToken);
+  const setAuth = async (newToken: string, refreshToken?: string) => {
+    setToken(newToken, refreshToken);
     setTok(newToken);
     const me = await apiFetch<User>("/users/me", { auth: true });
     setUser(me);
@@ -0,0 +1,3 @@
+-- Replication account for db-replica (docker-compose.replica.yml).
+CREATE USER IF NOT EXISTS 'repl'@'%' IDENTIFIED WITH mysql_native_password BY 'repl_pass';
+GRANT REPLICATION SLAVE ON *.* TO 'repl'@'%';
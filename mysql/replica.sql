@@ -0,0 +1,10 @@
+-- Follow the primary by GTID and refuse writes from anything but replication.
+CHANGE REPLICATION SOURCE TO
+    SOURCE_HOST = 'db',
+    SOURCE_PORT = 3306,
+    SOURCE_USER = 'repl',
+    SOURCE_PASSWORD = 'repl_pass',
+    SOURCE_AUTO_POSITION = 1,
+    SOURCE_CONNECT_RETRY = 5;
+START REPLICA;
+SET PERSIST super_read_only = ON;